@@ -12,6 +12,7 @@ import requests
 from O365.drive import File
 from bs4 import BeautifulSoup as bs
 
+from rypython.randas.cache import DownloadCache
 from rypython.ry365 import WorkBook
 
 logging.basicConfig(level=logging.INFO)
@@ -157,6 +158,9 @@ class DataFrame:
     source_file: File
     download_dir: Path
     sheet_name: str
+    cache: DownloadCache or bool
+        Reuse a local copy while the file's content is unchanged;
+        ``True`` uses a ``DownloadCache`` with default settings.
     **options: dict
 
     Attributes
@@ -182,17 +186,24 @@ class DataFrame:
             source_file: File,
             download_dir: Path = DEFAULT_DOWNLOAD_DIR,
             sheet_name: str = None,
+            cache: Union[DownloadCache, bool] = None,
             **options
     ):
         self.source_file = source_file
         self.file_type = source_file.name.rsplit('.', 1)[1].lower()
         self.download_dir = download_dir
         self.sheet_name = sheet_name
+        self.cache = DownloadCache() if cache is True else cache or None
         self.options = options
+        self.cached = False
 
     def __enter__(self):
-        self.source_file.download(self.download_dir)
-        self.local_file = self.download_dir / self.source_file.name
+        if self.cache is not None and (cached_file := self.cache.get(self.source_file)) is not None:
+            self.local_file = cached_file
+            self.cached = True
+        else:
+            self.source_file.download(self.download_dir)
+            self.local_file = Path(self.download_dir) / self.source_file.name
         self.data = self._parse_source_file()
         return self
 
@@ -209,4 +220,5 @@ class DataFrame:
         )
 
     def __exit__(self, type, value, traceback):
-        os.remove(self.local_file)
+        if not self.cached:
+            os.remove(self.local_file)
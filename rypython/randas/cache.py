@@ -0,0 +1,111 @@
+import hashlib
+import logging
+import os
+import tempfile
+from pathlib import Path
+from typing import Optional, Union
+
+from O365.drive import DriveItem
+
+from rypython.ry365 import get_etag
+
+DEFAULT_CACHE_DIR = os.environ.get(
+    'RYPYTHON_DOWNLOAD_CACHE_DIR',
+    Path.home() / '.cache' / 'rypython' / 'downloads'
+)
+
+DEFAULT_MAX_BYTES = 2 * 2 ** 30
+
+
+def _digest(value: str) -> str:
+    return hashlib.sha1(value.encode()).hexdigest()
+
+
+class DownloadCache:
+    """
+    Keeps downloaded drive items on disk keyed by item id and content tag,
+    so an item is only downloaded again once its content changes. Files are
+    staged in the cache directory and moved into place with os.replace, so
+    processes sharing a cache never see a partial file. The least recently
+    used files are evicted once the cache grows past ``max_bytes``.
+    """
+    def __init__(
+            self,
+            cache_dir: Union[str, Path] = DEFAULT_CACHE_DIR,
+            max_bytes: int = DEFAULT_MAX_BYTES
+    ):
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    def path_for(self, item: DriveItem, tag: str) -> Path:
+        return self.cache_dir / _digest(item.object_id) / f"{_digest(tag)}{Path(item.name).suffix}"
+
+    def get(self, item: DriveItem) -> Optional[Path]:
+        if (tag := get_etag(item, content_only=True)) is None:
+            return None
+        path = self.path_for(item, tag)
+        if path.exists():
+            try:
+                os.utime(path)
+            except OSError:
+                pass
+            else:
+                logging.info(f"Using cached {item.name}")
+                return path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with tempfile.TemporaryDirectory(dir=path.parent, prefix=".download-") as staging:
+            item.download(staging)
+            os.replace(Path(staging) / item.name, path)
+        logging.info(f"Downloaded {item.name} to cache")
+        self._remove_stale(path)
+        self.evict(keep=path)
+        return path
+
+    @staticmethod
+    def _remove_stale(path: Path):
+        for stale in path.parent.iterdir():
+            if stale != path and stale.is_file():
+                try:
+                    stale.unlink()
+                except OSError as e:
+                    logging.debug(f"Could not remove stale download {stale}: {e}")
+
+    def _entries(self):
+        entries = []
+        for path in self.cache_dir.glob("*/*"):
+            try:
+                if path.is_file():
+                    stat = path.stat()
+                    entries.append((stat.st_mtime, stat.st_size, path))
+            except OSError:
+                continue
+        return sorted(entries)
+
+    @property
+    def size(self) -> int:
+        return sum(size for _, size, _ in self._entries())
+
+    def evict(self, keep: Path = None):
+        entries = self._entries()
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                logging.debug(f"Could not evict {path}: {e}")
+                continue
+            total -= size
+
+    def clear(self):
+        for _, _, path in self._entries():
+            try:
+                path.unlink()
+            except OSError:
+                continue
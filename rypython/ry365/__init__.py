@@ -1,3 +1,4 @@
 from rypython.ry365.account import O365Account
 from rypython.ry365.excel import WorkBook, WorkSheet, Range
-from rypython.ry365.drive import Folder, Drive, Storage
\ No newline at end of file
+from rypython.ry365.drive import Folder, Drive, Storage, get_etag
+from rypython.ry365.sharepoint import Sharepoint, Site, SharepointList
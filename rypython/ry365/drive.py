@@ -6,6 +6,7 @@ from O365.drive import Drive as _Drive
 from O365.drive import Folder as _Folder
 from O365.drive import Storage as _Storage
 from O365.drive import Image, Photo, File
+from O365.drive import DriveItem
 
 
 logging.basicConfig(level=os.environ.get('LOGLEVEL', 'WARNING'))
@@ -40,6 +41,20 @@ class Folder(_Folder):
         folder.delete()
 
 
+def get_etag(item: DriveItem, content_only: bool = False):
+    url = item.build_url(item._endpoints.get('item').format(id=item.object_id))
+    try:
+        response = item.con.get(url, params={'$select': 'id,eTag,cTag'})
+    except requests.exceptions.HTTPError as e:
+        logging.warning(f"Could not get eTag for {item.name}: {e}")
+        return
+    if not response:
+        return
+    data = response.json()
+    if content_only:
+        return data.get('cTag') or data.get('eTag')
+    return data.get('eTag') or data.get('cTag')
+
 
 class Drive(_Drive):
     def __init__(self, *, parent=None, con=None, **kwargs):
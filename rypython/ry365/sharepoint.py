@@ -1,10 +1,65 @@
+from typing import Iterator, List
+
 from O365.sharepoint import Sharepoint as _Sharepoint
+from O365.sharepoint import SharepointList as _SharepointList
 from O365.sharepoint import Site as _Site
+from O365.utils import NEXT_LINK_KEYWORD
 
 from rypython.ry365.drive import Storage
 
+NON_INDEXED_QUERIES = {'Prefer': 'HonorNonIndexedQueriesWarningMayFailRandomly'}
+
+
+class SharepointList(_SharepointList):
+    _endpoints = {
+        **_SharepointList._endpoints,
+        'update_item_fields': '/items/{item_id}/fields'
+    }
+
+    def iter_item_pages(
+            self,
+            select: List[str] = None,
+            query: str = None,
+            order_by: str = None,
+            page_size: int = None
+    ) -> Iterator[List[dict]]:
+        """
+        Yields the raw item dicts one page at a time, following
+        @odata.nextLink. Only `select` fields are expanded and `query` is
+        sent as $filter, so both are applied server-side.
+        """
+        url = self.build_url(self._endpoints.get('get_items'))
+        params = {
+            '$select': 'id',
+            '$top': page_size or self.protocol.max_top_value,
+            'expand': f"fields(select={','.join(select)})" if select else 'fields'
+        }
+        if query:
+            params['$filter'] = query
+        if order_by:
+            params['$orderby'] = order_by
+        headers = NON_INDEXED_QUERIES if query or order_by else None
+        while url:
+            response = self.con.get(url, params=params, headers=headers)
+            if not response:
+                return
+            data = response.json()
+            yield data.get('value', [])
+            url, params = data.get(NEXT_LINK_KEYWORD), None
+
+    def create_item_fields(self, fields: dict) -> dict:
+        url = self.build_url(self._endpoints.get('get_items'))
+        response = self.con.post(url, {'fields': fields})
+        return response.json() if response else {}
+
+    def update_item_fields(self, item_id: str, fields: dict) -> bool:
+        url = self.build_url(self._endpoints.get('update_item_fields').format(item_id=item_id))
+        return bool(self.con.patch(url, fields))
+
 
 class Site(_Site):
+    list_constructor = SharepointList
+
     def __init__(self, *, parent=None, con=None, **kwargs):
         super().__init__(parent=parent, con=con, **kwargs)
         self.site_storage = Storage(parent=self, main_resource=f"/sites/{self.object_id}")
@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+import re
+
 import pandas as pd
 from typing import Dict, List, Any, Union
 from dataclasses import dataclass
@@ -16,14 +18,17 @@ class Mermaid:
     def add_line(self, new_line: str):
         self.lines.append(new_line)
 
-    def print(self):
+    def render(self) -> str:
         lines = [
             self.OPEN,
             self.declaration,
             *self.lines,
             self.CLOSE
         ]
-        print("\n".join(lines))
+        return "\n".join(lines)
+
+    def print(self):
+        print(self.render())
 
 
 @dataclass
@@ -174,36 +179,56 @@ class erDiagram(Mermaid):
     def __init__(self):
         super().__init__(declaration="erDiagram")
 
+    @staticmethod
+    def _identifier(name: str) -> str:
+        return re.sub(r"[^\w-]", "_", str(name))
+
+    @staticmethod
+    def _attribute_type(dtype: str) -> str:
+        return re.sub(r"[^\w()\[\]-]", "_", str(dtype)) or "any"
+
     def add_entity(
             self,
             entity_name: str,
             dtypes: Dict[str, str],
-            primary_key: str = None,
+            primary_key: Union[str, List[str]] = None,
             foreign_keys: List[str] = None,
             descriptions: Dict[str, str] = None
     ):
+        primary_key = [primary_key] if isinstance(primary_key, str) else primary_key or []
         foreign_keys = foreign_keys or []
         descriptions = descriptions or {}
-        self.add_line(f"{self.INDENT}{entity_name} {{")
+        self.add_line(f"{self.INDENT}{self._identifier(entity_name)} {{")
         for column_name, dtype in dtypes.items():
-            base_line = f"{self.INDENT*2}{dtype} {column_name}"
-            key_status = ""
-            if column_name == primary_key:
-                key_status = "PK"
-            if column_name in foreign_keys:
-                key_status = "FK"
-            description = descriptions.get(column_name, "")
-            full_line = f"{base_line} {key_status} {description}"
-            self.add_line(full_line)
+            parts = [f"{self.INDENT*2}{self._attribute_type(dtype)} {self._identifier(column_name)}"]
+            key_status = [
+                key_type
+                for key_type, keys in (("PK", primary_key), ("FK", foreign_keys))
+                if column_name in keys
+            ]
+            if key_status:
+                parts.append(", ".join(key_status))
+            if description := descriptions.get(column_name, ""):
+                parts.append(f'"{description}"')
+            self.add_line(" ".join(parts))
         self.add_line(f"{self.INDENT}}}")
 
-
+    def add_relationship(
+            self,
+            parent: str,
+            child: str,
+            label: str = "",
+            cardinality: str = "||--o{"
+    ):
+        self.add_line(
+            f'{self.INDENT}{self._identifier(parent)} {cardinality} {self._identifier(child)} : "{label}"'
+        )
 
     def add_entity_by_dtypes(
             self,
             entity_name: str,
             dtypes: pd.Series,
-            primary_key: str = None,
+            primary_key: Union[str, List[str]] = None,
             foreign_keys: List[str] = None,
             descriptions: Dict[str, str] = None
     ):
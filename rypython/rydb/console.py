@@ -0,0 +1,83 @@
+import pandas as pd
+from rich.console import Console
+from rich.live import Live
+from rich.table import Table
+
+from rypython.rydb.tables import RyDBTable
+
+DEFAULT_PAGE_SIZE = 20
+
+
+class TablePager:
+    """
+    Pages through a RyDB table, asking the source for one page at a time so
+    SQL sources can fetch pages server-side instead of loading the table.
+    """
+    def __init__(
+            self,
+            source,
+            table_name: str,
+            count: int = DEFAULT_PAGE_SIZE,
+            where_dict: dict = None,
+            column_formats: dict = None,
+            fillna: str = ""
+    ):
+        self.source = source
+        self.table_name = table_name
+        self.count = count
+        self.where_dict = where_dict
+        self.column_formats = column_formats
+        self.fillna = fillna
+        self.offset = 0
+        self.rows = self.fetch()
+
+    def fetch(self) -> pd.DataFrame:
+        self.rows = self.source.fetch_page(
+            self.table_name,
+            offset=self.offset,
+            count=self.count,
+            where_dict=self.where_dict
+        )
+        return self.rows
+
+    @property
+    def has_next(self):
+        return len(self.rows) == self.count
+
+    @property
+    def has_previous(self):
+        return self.offset > 0
+
+    def next(self) -> pd.DataFrame:
+        if self.has_next:
+            self.offset += self.count
+            self.fetch()
+        return self.rows
+
+    def previous(self) -> pd.DataFrame:
+        if self.has_previous:
+            self.offset = max(self.offset - self.count, 0)
+            self.fetch()
+        return self.rows
+
+    def render(self) -> Table:
+        first, last = self.offset + 1, self.offset + len(self.rows)
+        return RyDBTable.to_rich_table(
+            self.rows,
+            title=f"{self.table_name} (rows {first}-{last})" if len(self.rows) else self.table_name,
+            column_formats=self.column_formats,
+            fillna=self.fillna
+        )
+
+    def live(self, console: Console = None):
+        console = console or Console()
+        with Live(self.render(), console=console, auto_refresh=False) as live:
+            while True:
+                action = console.input("[n]ext, [p]revious, [q]uit: ").strip().lower()
+                if action.startswith("q"):
+                    break
+                if action.startswith("p"):
+                    self.previous()
+                else:
+                    self.next()
+                live.update(self.render(), refresh=True)
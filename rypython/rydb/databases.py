@@ -1,14 +1,34 @@
+import hashlib
+import json
 import logging
 import os
+import re
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+from dataclasses import dataclass
 from pathlib import Path
-from typing import List, Union, Dict, Any
+from typing import List, Union, Dict, Any, Callable, Tuple, Iterator, Iterable
 
+import numpy as np
 import pandas as pd
 import pyodbc
 
-from rypython.randas import DataFrame
-from rypython.ry365 import O365Account
-from rypython.rydb.tables import RyDBTable
+from rypython.ry365 import O365Account, SharepointList, Site, WorkBook, get_etag
+from rypython.ryagram import erDiagram
+from rypython.rydb.console import DEFAULT_PAGE_SIZE, TablePager
+from rypython.rydb.instrumentation import Instrumentation, Sink
+from rypython.rydb.join import JoinPlan
+from rypython.rydb.journal import WriteBehind
+from rypython.rydb.fetch import DEFAULT_BATCH_SIZE, iter_batches, read_query
+from rypython.rydb.pool import get_pool
+from rypython.rydb.schema import Catalog, TableSchema
+from rypython.rydb.snapshot import read_manifest, read_snapshot, write_snapshot
+from rypython.rydb.tables import RyDBTable, Transaction, UpdateSummary
 
 logging.basicConfig(level=logging.DEBUG)
 
@@ -17,11 +37,55 @@ DEFAULT_DOWNLOAD_DIR = os.environ.get(
     Path.home() / 'Downloads'
 )
 
+DEFAULT_CACHE_DIR = os.environ.get(
+    'RYPYTHON_CACHE_DIR',
+    Path.home() / '.cache' / 'rypython'
+)
+
+DEFAULT_CHUNKSIZE = 10_000
+
+ODBC_TYPES = {
+    "bool": pyodbc.SQL_BIT,
+    "int": pyodbc.SQL_BIGINT,
+    "float": pyodbc.SQL_DOUBLE,
+    "datetime": pyodbc.SQL_TYPE_TIMESTAMP,
+    "string": pyodbc.SQL_WVARCHAR
+}
+
+UNORDERABLE_TYPES = {"text", "ntext", "image", "xml", "geography", "geometry"}
+
+
+@dataclass
+class RefreshSummary:
+    table_name: str
+    inserted: int = 0
+    updated: int = 0
+    deleted: int = 0
+    reloaded: bool = False
+
+    def __str__(self):
+        if self.reloaded:
+            return f"{self.table_name}: reloaded in full"
+        return (
+            f"{self.table_name}: {self.inserted} inserted, "
+            f"{self.updated} updated, {self.deleted} deleted"
+        )
+
+
+def _nbytes(df: pd.DataFrame) -> int:
+    return int(df.memory_usage(index=False).sum())
+
 
 class RyDBSource:
-    def __init__(self, type: str, **kwargs):
+    def __init__(self, type: str, compact: bool = False, **kwargs):
         self.type = type
         self.updated = set()
+        self.compact = compact
+        self.memory_reports = {}
+        self.instrumentation = Instrumentation()
+
+    def measure(self, operation: str, target: str = "", rows_in: int = 0):
+        return self.instrumentation.measure(self.type, operation, target=target, rows_in=rows_in)
 
     @property
     def has_changed(self):
@@ -36,12 +100,20 @@ class RyDBSource:
     def collect_table(self, table_name: str):
         return self.conn.get(table_name)
 
+    def _loaded(self, table: RyDBTable) -> RyDBTable:
+        if self.compact:
+            self.memory_reports[table.name] = table.compact()
+        return table
+
     def collect_all(self):
         ...
 
     def replace(self, tables: Dict[str, pd.DataFrame]) -> None:
         ...
 
+    def close(self):
+        ...
+
     def update_row(
             self,
             table_name: RyDBTable,
@@ -50,53 +122,314 @@ class RyDBSource:
     ):
         # table = self.collect_table(table_name)
         self.updated.add(table_name)
-        self.conn[table_name].update_row(set_dict=set_dict, where_dict=where_dict)
+        with self.measure("update", table_name, rows_in=1):
+            self.conn[table_name].update_row(set_dict=set_dict, where_dict=where_dict)
+
+    def update_rows(
+            self,
+            table_name: str,
+            changes: pd.DataFrame,
+            on: Union[str, List[str]]
+    ) -> UpdateSummary:
+        with self.measure("update", table_name, rows_in=len(changes)) as measurement:
+            summary = self.conn[table_name].update_rows(changes, on=on)
+            measurement.rows_out = summary.changed
+        if summary.changed:
+            self.updated.add(table_name)
+        return summary
+
+    def append_rows(self, table_name: str, rows: pd.DataFrame):
+        self.updated.add(table_name)
+        with self.measure("insert", table_name, rows_in=len(rows)):
+            self.conn[table_name].append_rows(rows)
+
+    def delete_rows(self, table_name: str, where_dict: dict) -> int:
+        self.updated.add(table_name)
+        with self.measure("delete", table_name) as measurement:
+            measurement.rows_out = self.conn[table_name].delete_rows(where_dict)
+        return measurement.rows_out
+
+    def lookup(
+            self,
+            table_name: str,
+            where_dict: dict,
+            column_names: List[str] = None
+    ) -> pd.DataFrame:
+        table = self.conn[table_name]
+        hits = table.cache.stats.hits if table.cache is not None else None
+        with self.measure("lookup", table_name) as measurement:
+            result = table.loc(where_dict, column_names)
+            measurement.rows_out = len(result)
+            if hits is not None:
+                measurement.cache_hit = table.cache.stats.hits > hits
+        return result
+
+    def fetch_page(
+            self,
+            table_name: str,
+            offset: int = 0,
+            count: int = DEFAULT_PAGE_SIZE,
+            where_dict: dict = None
+    ) -> pd.DataFrame:
+        with self.measure("page", table_name) as measurement:
+            rows = self.conn[table_name].page(offset, count, where_dict=where_dict)
+            measurement.rows_out = len(rows)
+        return rows
+
+    def _columns(self, table_name: str) -> List[str]:
+        return self.conn[table_name].columns
+
+    def catalog(self) -> Catalog:
+        return Catalog(
+            columns={
+                table_name: {
+                    column_name: dtype.name
+                    for column_name, dtype in table.df.dtypes.items()
+                }
+                for table_name, table in self.conn.items()
+            },
+            primary_keys={
+                table_name: table.primary_key
+                for table_name, table in self.conn.items()
+                if table.primary_key
+            }
+        )
+
+    def join(
+            self,
+            left: str,
+            right: str,
+            on: Union[str, List[str]],
+            columns: List[str] = None,
+            how: str = "inner"
+    ) -> pd.DataFrame:
+        plan = JoinPlan.build(
+            left,
+            self._columns(left),
+            right,
+            self._columns(right),
+            on,
+            columns=columns,
+            how=how
+        )
+        return self._join(plan)
+
+    def _join(self, plan: JoinPlan) -> pd.DataFrame:
+        return self._hash_join(plan, self.conn[plan.left], self.conn[plan.right])
+
+    def _hash_join(self, plan: JoinPlan, left: RyDBTable, right: RyDBTable) -> pd.DataFrame:
+        with self.measure("join", f"{plan.left} {plan.how} join {plan.right}") as measurement:
+            df = plan.hash_join(left, right)
+            measurement.rows_out = len(df)
+            measurement.nbytes = _nbytes(df)
+        return df
+
+    def refresh(self, table_name: str) -> RefreshSummary:
+        self.conn[table_name] = self.collect_table(table_name)
+        return RefreshSummary(table_name, reloaded=True)
+
+    def stage(self, op: str, table_name: str, **payload):
+        if table_name not in self.conn:
+            return getattr(self, op)(table_name, **payload)
+        return getattr(RyDBSource, op)(self, table_name, **payload)
+
+
+def _read_sheet(path: Union[str, Path], sheet_name: str) -> pd.DataFrame:
+    return pd.read_excel(path, sheet_name=sheet_name)
 
 
 class O365DB(RyDBSource):
+    workbook_constructor = WorkBook
+
     def __init__(
             self,
             site: str,
             filepath: str,
-            db_filename: str
+            db_filename: str,
+            delta_commit: bool = True,
+            compact: bool = False,
+            parse_workers: int = None,
+            cache_dir: Union[str, Path, None] = DEFAULT_CACHE_DIR
     ):
-        super().__init__(type="o365")
+        super().__init__(type="o365", compact=compact)
         self.site = site
         self.filepath = filepath.split("/")
         self.db_filename = db_filename
+        self.delta_commit = delta_commit
+        self.parse_workers = parse_workers
+        self.cache_dir = Path(cache_dir) if cache_dir is not None else None
         self.db_file = self.connect()
         self.conn = self.collect_all()
+        self.layout = self._layout()
 
     def connect(self):
         account = O365Account(site=self.site)
         folder = account.get_folder(*self.filepath)
         return folder.get_item(self.db_filename)
 
+    def _cache_path(self, etag: str, sheet_name: str = None, suffix: str = "parquet") -> Path:
+        key = hashlib.sha1(f"{etag}:{sheet_name or ''}".encode()).hexdigest()
+        return self.cache_dir / self.db_file.object_id / f"{key}.{suffix if sheet_name else 'json'}"
+
+    def _read_cache(self, etag: str) -> Tuple[List[str], Dict[str, pd.DataFrame]]:
+        if self.cache_dir is None or etag is None:
+            return [], {}
+        if not (manifest := self._cache_path(etag)).exists():
+            return [], {}
+        sheet_names = json.loads(manifest.read_text())
+        tables = {}
+        for sheet_name in sheet_names:
+            try:
+                if (cached := self._cache_path(etag, sheet_name)).exists():
+                    tables[sheet_name] = pd.read_parquet(cached)
+                elif (cached := self._cache_path(etag, sheet_name, suffix="pickle")).exists():
+                    tables[sheet_name] = pd.read_pickle(cached)
+            except (ImportError, OSError, ValueError) as e:
+                logging.debug(f"Could not read cached {sheet_name}: {e}")
+        return sheet_names, tables
+
+    def _write_cache(self, etag: str, tables: Dict[str, pd.DataFrame]):
+        if self.cache_dir is None or etag is None:
+            return
+        item_dir = self.cache_dir / self.db_file.object_id
+        shutil.rmtree(item_dir, ignore_errors=True)
+        item_dir.mkdir(parents=True)
+        for sheet_name, table in tables.items():
+            try:
+                table.to_parquet(self._cache_path(etag, sheet_name), index=False)
+            except (ImportError, ValueError, TypeError, OverflowError) as e:
+                logging.debug(f"Caching {sheet_name} as pickle: {e}")
+                self._cache_path(etag, sheet_name).unlink(missing_ok=True)
+                table.to_pickle(self._cache_path(etag, sheet_name, suffix="pickle"))
+        self._cache_path(etag).write_text(json.dumps(list(tables)))
+
+    def _parse_sheets(self, path: Path, sheet_names: List[str]) -> Dict[str, pd.DataFrame]:
+        workers = min(self.parse_workers or os.cpu_count() or 1, len(sheet_names))
+        if workers <= 1:
+            return {sheet_name: _read_sheet(path, sheet_name) for sheet_name in sheet_names}
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            parsed = executor.map(_read_sheet, [path] * len(sheet_names), sheet_names)
+            return dict(zip(sheet_names, parsed))
+
+    def _collect_sheets(self, sheet_names: List[str] = None) -> Dict[str, pd.DataFrame]:
+        with self.measure("collect", self.db_filename) as measurement:
+            tables = self._download_sheets(sheet_names, measurement)
+            measurement.rows_out = sum(len(table) for table in tables.values())
+            measurement.nbytes = sum(_nbytes(table) for table in tables.values())
+        return tables
+
+    def _download_sheets(self, sheet_names: List[str], measurement) -> Dict[str, pd.DataFrame]:
+        etag = get_etag(self.db_file) if self.cache_dir is not None else None
+        all_sheets, cached = self._read_cache(etag)
+        wanted = sheet_names or all_sheets
+        measurement.cache_hit = bool(wanted) and all(sheet_name in cached for sheet_name in wanted)
+        if measurement.cache_hit:
+            logging.info(f"Loaded {len(wanted)} sheets of {self.db_filename} from cache")
+            return {sheet_name: cached[sheet_name] for sheet_name in wanted}
+        with tempfile.TemporaryDirectory() as download_dir:
+            self.db_file.download(to_path=download_dir)
+            local_db_file = Path(download_dir) / self.db_file.name
+            all_sheets = pd.ExcelFile(local_db_file).sheet_names
+            wanted = sheet_names or all_sheets
+            missing = [sheet_name for sheet_name in wanted if sheet_name not in cached]
+            start = time.perf_counter()
+            parsed = self._parse_sheets(local_db_file, missing)
+            logging.info(
+                f"Parsed {len(missing)} sheets of {self.db_filename} "
+                f"in {time.perf_counter() - start:.2f}s"
+            )
+        tables = {**cached, **parsed}
+        if sheet_names is None:
+            self._write_cache(etag, {sheet_name: tables[sheet_name] for sheet_name in all_sheets})
+        return {sheet_name: tables[sheet_name] for sheet_name in wanted}
+
     def collect_table(self, table_name):
-        with DataFrame(self.db_file, sheet_name=table_name) as db:
-            return RyDBTable(table_name, db.data)
+        table = self._collect_sheets([table_name])[table_name]
+        return self._loaded(RyDBTable(table_name, table))
 
     def collect_all(self):
-        with DataFrame(self.db_file) as db:
-            return {
-                table_name: RyDBTable(table_name, table)
-                for table_name, table in db.data.items()
-            }
+        return {
+            table_name: self._loaded(RyDBTable(table_name, table))
+            for table_name, table in self._collect_sheets().items()
+        }
+
+    def _layout(self) -> Dict[str, List[str]]:
+        return {
+            table_name: table.columns
+            for table_name, table in self.conn.items()
+        }
+
+    def _structure_changed(self, table: RyDBTable) -> bool:
+        return bool(table.changes.deleted) or table.columns != self.layout.get(table.name)
+
+    @staticmethod
+    def _column_letter(column_number: int) -> str:
+        letters = ""
+        while column_number:
+            column_number, remainder = divmod(column_number - 1, 26)
+            letters = chr(65 + remainder) + letters
+        return letters
+
+    @staticmethod
+    def _to_excel_values(rows: pd.DataFrame) -> List[list]:
+        rows = rows.copy()
+        for column_name in rows.columns:
+            if pd.api.types.is_datetime64_any_dtype(rows[column_name]):
+                rows[column_name] = rows[column_name].dt.strftime("%Y-%m-%d %H:%M:%S")
+        return rows.astype(object).where(rows.notna(), "").values.tolist()
+
+    def _push_changes(self, workbook: WorkBook, table: RyDBTable):
+        labels = list(set(table.changes.updated) | table.changes.inserted)
+        positions = np.sort(table.df.index.get_indexer(labels))
+        positions = positions[positions >= 0]
+        worksheet = workbook.get_worksheet(table.name)
+        last_column = self._column_letter(len(table.columns))
+        runs = np.split(positions, np.flatnonzero(np.diff(positions) != 1) + 1)
+        with self.measure("update", table.name, rows_in=len(positions)):
+            for run in runs:
+                if not len(run):
+                    continue
+                top, bottom = run[0] + 2, run[-1] + 2
+                values = self._to_excel_values(table.df.iloc[run])
+                worksheet.get_range(f"A{top}:{last_column}{bottom}").update(values)
+        logging.info(f"Updated {len(positions)} rows of {table.name} in {len(runs)} ranges")
+
+    def _upload_all(self):
+        local_db_file = Path(DEFAULT_DOWNLOAD_DIR) / self.db_file.name
+        with pd.ExcelWriter(local_db_file, engine="xlsxwriter") as writer:
+            for table_name, table in self.conn.items():
+                table.df.to_excel(writer, sheet_name=table_name, index=False)
+        if not local_db_file.exists():
+            logging.error(f"Could not find {local_db_file}!")
+            return
+        folder = self.db_file.get_parent()
+        with self.measure("upload", self.db_filename) as measurement:
+            measurement.nbytes = local_db_file.stat().st_size
+            if new_db_file := folder.upload_file(local_db_file):
+                self.db_file = new_db_file
+                logging.info(f"Database file updated at {new_db_file}")
+        os.remove(local_db_file)
 
     def commit(self):
-        if self.has_changed:
-            local_db_file = DEFAULT_DOWNLOAD_DIR / self.db_file.name
-            with pd.ExcelWriter(local_db_file, engine="xlsxwriter") as writer:
-                for table_name, table in self.conn.items():
-                    table.to_excel(writer, sheet_name=table_name, index=False)
-                if not local_db_file.exists():
-                    logging.error(f"Could not find {local_db_file}!")
-                    return
-                folder = self.db_file.get_parent()
-                self.db_file.delete()
-                folder.upload_file(local_db_file)
-                if new_db_file := folder.get_item(local_db_file.name):
-                    logging.info(f"Database file updated at {new_db_file}")
+        if not self.has_changed:
+            return
+        dirty = [
+            table for table in self.conn.values()
+            if table.changes.is_dirty
+        ]
+        if not self.delta_commit or any(
+                self._structure_changed(table)
+                for table in self.conn.values()
+        ):
+            self._upload_all()
+            self.layout = self._layout()
+        else:
+            workbook = self.workbook_constructor(self.db_file)
+            for table in dirty:
+                self._push_changes(workbook, table)
+        for table in dirty:
+            table.changes.clear()
+        self.updated.clear()
 
     def list_tables(self):
         return list(self.data.keys())
@@ -126,7 +459,120 @@ class O365DB(RyDBSource):
             self.folder.upload_file(new_local_db_file)
 
 
-class SQLDB(RyDBSource):
+class SQLSource(RyDBSource):
+    @staticmethod
+    def quote(name: str) -> str:
+        ...
+
+    def execute(self, query: str, *values: Any):
+        ...
+
+    def executemany(self, query: str, df: pd.DataFrame, chunksize: int = DEFAULT_CHUNKSIZE):
+        ...
+
+    def read_query(self, query: str, *params: Any) -> pd.DataFrame:
+        ...
+
+    def _page_query(self, table_name: str, offset: int, count: int, where_clause: str) -> str:
+        ...
+
+    def _where_clause(self, column_names: Iterable[str]) -> str:
+        return " AND ".join(f"{self.quote(column_name)} = ?" for column_name in column_names)
+
+    def fetch_page(
+            self,
+            table_name: str,
+            offset: int = 0,
+            count: int = DEFAULT_PAGE_SIZE,
+            where_dict: dict = None
+    ) -> pd.DataFrame:
+        if table_name in self.conn:
+            return super().fetch_page(table_name, offset=offset, count=count, where_dict=where_dict)
+        where_dict = where_dict or {}
+        query = self._page_query(table_name, int(offset), int(count), self._where_clause(where_dict))
+        return self.read_query(query, *where_dict.values())
+
+    def _can_push_down(self, plan: JoinPlan) -> bool:
+        """
+        Joins run on the server only when a side is not loaded, which needs a
+        source opened with load=False; joining loaded tables in memory
+        transfers nothing. A loaded side with uncommitted changes keeps the
+        join in memory so the result includes them.
+        """
+        tables = [self.conn.get(table_name) for table_name in (plan.left, plan.right)]
+        return None in tables and not any(
+            table is not None and table.changes.is_dirty
+            for table in tables
+        )
+
+    def _push_down(self, plan: JoinPlan) -> pd.DataFrame:
+        return self.read_query(plan.to_sql(self.quote))
+
+    def _join(self, plan: JoinPlan) -> pd.DataFrame:
+        if self._can_push_down(plan):
+            return self._push_down(plan)
+        left, right = (
+            self.conn[table_name] if table_name in self.conn else self.collect_table(table_name)
+            for table_name in (plan.left, plan.right)
+        )
+        return self._hash_join(plan, left, right)
+
+    @staticmethod
+    def _to_params(df: pd.DataFrame):
+        values = df.astype(object)
+        return list(
+            values.where(df.notna(), None).itertuples(index=False, name=None)
+        )
+
+    def _insert_query(self, table_name: str, column_names: List[str]):
+        columns = ", ".join(self.quote(column_name) for column_name in column_names)
+        placeholders = ", ".join("?" for _ in column_names)
+        return f"INSERT INTO {self.quote(table_name)} ({columns}) VALUES ({placeholders})"
+
+    def _insert_columns(self, table: RyDBTable) -> List[str]:
+        generated = set(self.generated_columns.get(table.name, []))
+        return [column for column in table.columns if column not in generated]
+
+    def _commit_changes(self, table: RyDBTable):
+        primary_key = table.primary_key
+        changes = table.changes
+        if not primary_key and (changes.updated or changes.deleted):
+            raise ValueError(f"{table.name} has no primary key; cannot commit updated or deleted rows!")
+        table_name = self.quote(table.name)
+        where_clause = self._where_clause(primary_key or [])
+        if changes.deleted:
+            keys = pd.DataFrame(list(changes.deleted.values()), columns=primary_key)
+            self.executemany(f"DELETE FROM {table_name} WHERE {where_clause}", keys)
+        if changes.updated:
+            labels = list(changes.updated)
+            set_columns = sorted(set().union(*changes.updated.values()))
+            rows = table.df.loc[labels]
+            keys = pd.DataFrame(
+                [
+                    changes.original_keys.get(label, current_key)
+                    for label, current_key in zip(
+                        labels,
+                        rows[primary_key].itertuples(index=False, name=None)
+                    )
+                ],
+                columns=[f"_key_{key}" for key in primary_key]
+            )
+            set_clause = ", ".join(f"{self.quote(set_column)} = ?" for set_column in set_columns)
+            self.executemany(
+                f"UPDATE {table_name} SET {set_clause} WHERE {where_clause}",
+                pd.concat([rows[set_columns].reset_index(drop=True), keys], axis=1)
+            )
+        if changes.inserted:
+            columns = self._insert_columns(table)
+            rows = table.df.loc[list(changes.inserted), columns]
+            self.executemany(self._insert_query(table.name, columns), rows)
+        logging.info(
+            f"Committed {len(changes.inserted)} inserted, {len(changes.updated)} updated "
+            f"and {len(changes.deleted)} deleted rows to {table.name}"
+        )
+
+
+class SQLDB(SQLSource):
     def __init__(
             self,
             username: str,
@@ -135,18 +581,34 @@ class SQLDB(RyDBSource):
             database: str,
             port: int = 1433,
             driver: str = "{ODBC Driver 17 for SQL Server}",
-            engine: str = "pyodbc"
+            engine: str = "pyodbc",
+            min_pool_size: int = 1,
+            max_pool_size: int = 10,
+            max_workers: int = 8,
+            load: bool = True,
+            compact: bool = False,
+            watermarks: Dict[str, str] = None
     ):
-        super().__init__(type="sql")
+        super().__init__(type="sql", compact=compact)
         self.server = server
         self.host = server.split(".", 1)[0]
         self.database = database
         self.port = port
         self.driver = driver
         self.engine = engine
-        self._conn = self.connect(username, password)
+        self.min_pool_size = min_pool_size
+        self.max_pool_size = max_pool_size
+        self.max_workers = max_workers
+        self.load = load
+        self.failed_tables = {}
+        self.primary_keys = {}
+        self.generated_columns = {}
+        self.watermark_columns = watermarks or {}
+        self.watermarks = {}
+        self.change_tracked = set()
+        self._local = threading.local()
+        self.pool = self.connect(username, password)
         self.conn = self.collect_all()
-        self.curr = self._conn.cursor()
 
     def connect(self, username: str, password: str):
         if self.engine != "pyodbc":
@@ -161,19 +623,209 @@ class SQLDB(RyDBSource):
                 f"PWD={password}"
             ]
         )
-        return pyodbc.connect(conn_string)
+        return get_pool(
+            conn_string,
+            min_size=self.min_pool_size,
+            max_size=self.max_pool_size
+        )
 
-    def collect_table(self, table_name: str = None):
+    @property
+    def _conn(self):
+        """
+        The connection holding this thread's open transaction. pyodbc
+        connections are not thread-safe, so each thread (e.g. a write-behind
+        flush) keeps its own rather than sharing the caller's.
+        """
+        return getattr(self._local, "conn", None)
+
+    @_conn.setter
+    def _conn(self, conn):
+        self._local.conn = conn
+
+    @contextmanager
+    def connection(self):
+        if self._conn is not None:
+            yield self._conn
+            return
+        with self.pool.connection() as conn:
+            yield conn
+
+    @staticmethod
+    def quote(name: str) -> str:
+        return "[{}]".format(name.replace("]", "]]"))
+
+    def _page_order(self, table_name: str) -> List[str]:
+        """
+        OFFSET/FETCH pages are only stable under a total order, so keyless
+        tables are ordered by every column, and refused when a column's type
+        cannot be sorted.
+        """
+        if primary_key := self.primary_keys.get(table_name):
+            return primary_key
+        query = """
+        SELECT COLUMN_NAME as column_name,
+            DATA_TYPE as data_type
+        FROM INFORMATION_SCHEMA.COLUMNS
+        WHERE TABLE_NAME = ?
+        ORDER BY ORDINAL_POSITION;
+        """
+        with self.connection() as conn:
+            columns = read_query(conn, query, table_name)
+        if unorderable := columns.column_name[columns.data_type.str.lower().isin(UNORDERABLE_TYPES)].tolist():
+            raise ValueError(
+                f"{table_name} has no primary key and cannot be ordered by {unorderable}; "
+                f"load it to page through it in memory"
+            )
+        return columns.column_name.tolist()
+
+    def _page_query(self, table_name: str, offset: int, count: int, where_clause: str) -> str:
+        order_by = ", ".join(self.quote(column) for column in self._page_order(table_name))
+        where = f" WHERE {where_clause}" if where_clause else ""
+        return (
+            f"SELECT * FROM {self.quote(table_name)}{where} ORDER BY {order_by} "
+            f"OFFSET {offset} ROWS FETCH NEXT {count} ROWS ONLY"
+        )
+
+    @contextmanager
+    def cursor(self):
+        if self._conn is None:
+            self._conn = self.pool.acquire()
+        curr = self._conn.cursor()
+        try:
+            yield curr
+        finally:
+            curr.close()
+
+    def _read_table(self, table_name: str, conn: pyodbc.Connection):
         query = f"""
-        SELECT * FROM {table_name} 
+        SELECT * FROM {self.quote(table_name)}
         """
-        return RyDBTable(table_name, pd.read_sql(query, self._conn))
+        version = None
+        if table_name in self.change_tracked:
+            version = self._scalar(conn, "SELECT CHANGE_TRACKING_CURRENT_VERSION()")
+        with self.measure("collect", table_name) as measurement:
+            df = read_query(conn, query)
+            measurement.rows_out = len(df)
+            measurement.nbytes = _nbytes(df)
+        table = self._loaded(
+            RyDBTable(
+                table_name,
+                df,
+                primary_key=self.primary_keys.get(table_name)
+            )
+        )
+        self._mark_synced(table, version)
+        return table
 
-    def collect_all(self):
+    @staticmethod
+    def _scalar(conn: pyodbc.Connection, query: str, *values: Any):
+        curr = conn.cursor()
+        try:
+            curr.execute(query, *values)
+            row = curr.fetchone()
+            return row[0] if row else None
+        finally:
+            curr.close()
+
+    def _mark_synced(self, table: RyDBTable, version: int = None):
+        if version is not None:
+            table.sync_point = ("change_tracking", version)
+            return
+        column_name = self.watermarks.get(table.name)
+        if column_name in table.columns and table.df[column_name].notna().any():
+            table.sync_point = ("watermark", table.df[column_name].max())
+
+    @property
+    def sync_state(self) -> Dict[str, Tuple[str, Any]]:
+        """
+        The sync point of each loaded table. Sync points live on the tables
+        themselves, so they always describe the data that was kept.
+        """
+        return {
+            table_name: table.sync_point
+            for table_name, table in self.conn.items()
+            if table.sync_point is not None
+        }
+
+    def collect_table(self, table_name: str = None):
+        with self.connection() as conn:
+            return self._read_table(table_name, conn)
+
+    def read_query(self, query: str, *params: Any, batch_size: int = DEFAULT_BATCH_SIZE) -> pd.DataFrame:
+        with self.measure("query", query) as measurement, self.connection() as conn:
+            df = read_query(conn, query, *params, batch_size=batch_size)
+            measurement.rows_out = len(df)
+            measurement.nbytes = _nbytes(df)
+        return df
+
+    def iter_batches(
+            self,
+            query: str,
+            *params: Any,
+            batch_size: int = DEFAULT_BATCH_SIZE
+    ) -> Iterator[pd.DataFrame]:
+        with self.measure("query", query) as measurement, self.connection() as conn:
+            curr = conn.cursor()
+            try:
+                curr.execute(query, *params)
+                for batch in iter_batches(curr, batch_size=batch_size):
+                    measurement.rows_out += len(batch)
+                    measurement.nbytes += _nbytes(batch)
+                    yield batch
+            finally:
+                curr.close()
+
+    def _timed_collect(self, table_name: str) -> Tuple[RyDBTable, float]:
+        start = time.perf_counter()
+        with self.pool.connection() as conn:
+            table = self._read_table(table_name, conn)
+        return table, time.perf_counter() - start
+
+    def collect_all(
+            self,
+            max_workers: int = None,
+            progress: Callable[[str, int, int, float], None] = None
+    ):
         table_names = self.list_tables()
+        self.primary_keys = self.list_primary_keys()
+        self.generated_columns = self.list_generated_columns()
+        self.watermarks = {**self.list_rowversion_columns(), **self.watermark_columns}
+        self.change_tracked = self.list_change_tracked_tables()
+        if not self.load:
+            return {}
+        total = len(table_names)
+        max_workers = min(max_workers or self.max_workers, self.pool.max_size)
+        tables = {}
+        self.failed_tables = {}
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=max(max_workers, 1)) as executor:
+            futures = {
+                executor.submit(self._timed_collect, table_name): table_name
+                for table_name in table_names
+            }
+            for done, future in enumerate(as_completed(futures), start=1):
+                table_name = futures[future]
+                try:
+                    table, elapsed = future.result()
+                except Exception as e:
+                    logging.error(f"[{done}/{total}] Could not collect {table_name}: {e}")
+                    self.failed_tables[table_name] = e
+                    continue
+                tables[table_name] = table
+                logging.info(
+                    f"[{done}/{total}] Collected {table_name} "
+                    f"({table.shape[0]} rows) in {elapsed:.2f}s"
+                )
+                if progress is not None:
+                    progress(table_name, done, total, elapsed)
+        logging.info(
+            f"Collected {len(tables)} of {total} tables "
+            f"in {time.perf_counter() - start:.2f}s"
+        )
         return {
-            table_name: self.collect_table(table_name)
+            table_name: tables[table_name]
             for table_name in table_names
+            if table_name in tables
         }
 
     def list_tables(self):
@@ -185,23 +837,363 @@ class SQLDB(RyDBSource):
         FROM sys.tables t
         ORDER BY schema_name, table_name;
         """
-        df = pd.read_sql(query, self._conn)
+        with self.connection() as conn:
+            df = read_query(conn, query)
         return df.table_name.tolist()
 
+    def list_primary_keys(self) -> Dict[str, List[str]]:
+        query = """
+        SELECT ku.TABLE_NAME as table_name,
+            ku.COLUMN_NAME as column_name
+        FROM INFORMATION_SCHEMA.TABLE_CONSTRAINTS tc
+        JOIN INFORMATION_SCHEMA.KEY_COLUMN_USAGE ku
+            ON tc.CONSTRAINT_NAME = ku.CONSTRAINT_NAME
+            AND tc.TABLE_NAME = ku.TABLE_NAME
+        WHERE tc.CONSTRAINT_TYPE = 'PRIMARY KEY'
+        ORDER BY ku.TABLE_NAME, ku.ORDINAL_POSITION;
+        """
+        with self.connection() as conn:
+            df = read_query(conn, query)
+        return df.groupby("table_name", sort=False).column_name.agg(list).to_dict()
+
+    def _columns(self, table_name: str) -> List[str]:
+        if table_name in self.conn:
+            return super()._columns(table_name)
+        query = """
+        SELECT COLUMN_NAME as column_name
+        FROM INFORMATION_SCHEMA.COLUMNS
+        WHERE TABLE_NAME = ?
+        ORDER BY ORDINAL_POSITION;
+        """
+        with self.connection() as conn:
+            return read_query(conn, query, table_name).column_name.tolist()
+
+    def lookup(
+            self,
+            table_name: str,
+            where_dict: dict,
+            column_names: List[str] = None
+    ) -> pd.DataFrame:
+        if table_name in self.conn:
+            return super().lookup(table_name, where_dict, column_names)
+        columns = "*" if column_names is None else ", ".join(self.quote(column) for column in column_names)
+        query = f"SELECT {columns} FROM {self.quote(table_name)} WHERE {self._where_clause(where_dict)}"
+        return self.read_query(query, *where_dict.values())
+
+    def catalog(self) -> Catalog:
+        columns_query = """
+        SELECT c.TABLE_NAME as table_name,
+            c.COLUMN_NAME as column_name,
+            c.DATA_TYPE as data_type,
+            c.CHARACTER_MAXIMUM_LENGTH as max_length
+        FROM INFORMATION_SCHEMA.COLUMNS c
+        JOIN INFORMATION_SCHEMA.TABLES t
+            ON c.TABLE_SCHEMA = t.TABLE_SCHEMA
+            AND c.TABLE_NAME = t.TABLE_NAME
+        WHERE t.TABLE_TYPE = 'BASE TABLE'
+        ORDER BY c.TABLE_NAME, c.ORDINAL_POSITION;
+        """
+        foreign_keys_query = """
+        SELECT fk.name as constraint_name,
+            object_name(fk.parent_object_id) as table_name,
+            col_name(fkc.parent_object_id, fkc.parent_column_id) as column_name,
+            object_name(fk.referenced_object_id) as referenced_table,
+            col_name(fkc.referenced_object_id, fkc.referenced_column_id) as referenced_column
+        FROM sys.foreign_keys fk
+        JOIN sys.foreign_key_columns fkc
+            ON fk.object_id = fkc.constraint_object_id
+        ORDER BY fk.name, fkc.constraint_column_id;
+        """
+        with self.connection() as conn:
+            columns = read_query(conn, columns_query)
+            foreign_keys = read_query(conn, foreign_keys_query)
+        lengths = columns.max_length.map(
+            lambda length: "" if pd.isna(length) else "(max)" if length == -1 else f"({int(length)})"
+        )
+        columns["data_type"] = columns.data_type + lengths
+        return Catalog.from_frames(columns, self.list_primary_keys(), foreign_keys)
+
+    def list_generated_columns(self) -> Dict[str, List[str]]:
+        query = """
+        SELECT TABLE_NAME as table_name,
+            COLUMN_NAME as column_name
+        FROM INFORMATION_SCHEMA.COLUMNS
+        WHERE DATA_TYPE IN ('timestamp', 'rowversion')
+            OR COLUMNPROPERTY(
+                OBJECT_ID(QUOTENAME(TABLE_SCHEMA) + '.' + QUOTENAME(TABLE_NAME)),
+                COLUMN_NAME,
+                'IsIdentity'
+            ) = 1
+            OR COLUMNPROPERTY(
+                OBJECT_ID(QUOTENAME(TABLE_SCHEMA) + '.' + QUOTENAME(TABLE_NAME)),
+                COLUMN_NAME,
+                'IsComputed'
+            ) = 1
+        ORDER BY TABLE_NAME, ORDINAL_POSITION;
+        """
+        with self.connection() as conn:
+            df = read_query(conn, query)
+        return df.groupby("table_name", sort=False).column_name.agg(list).to_dict()
+
+    def list_rowversion_columns(self) -> Dict[str, str]:
+        query = """
+        SELECT TABLE_NAME as table_name,
+            COLUMN_NAME as column_name
+        FROM INFORMATION_SCHEMA.COLUMNS
+        WHERE DATA_TYPE IN ('timestamp', 'rowversion');
+        """
+        with self.connection() as conn:
+            df = read_query(conn, query)
+        return dict(zip(df.table_name, df.column_name))
+
+    def list_change_tracked_tables(self) -> set:
+        query = """
+        SELECT object_name(object_id) as table_name
+        FROM sys.change_tracking_tables;
+        """
+        try:
+            with self.connection() as conn:
+                df = read_query(conn, query)
+        except pyodbc.Error as e:
+            logging.debug(f"Change tracking unavailable: {e}")
+            return set()
+        return set(df.table_name)
+
+    @staticmethod
+    def _to_param(value: Any):
+        if isinstance(value, pd.Timestamp):
+            return value.to_pydatetime()
+        if isinstance(value, np.generic):
+            return value.item()
+        return value
+
+    def _merge(
+            self,
+            table: RyDBTable,
+            rows: pd.DataFrame,
+            deleted_keys: pd.DataFrame = None
+    ) -> RefreshSummary:
+        summary = RefreshSummary(table.name)
+        with table.changes.suspended():
+            if deleted_keys is not None and len(deleted_keys):
+                summary.deleted = table.delete_keys(deleted_keys)
+            if len(rows):
+                upserted = table.upsert_rows(rows, on=table.primary_key)
+                summary.inserted = upserted.unmatched
+                summary.updated = upserted.changed
+        return summary
+
+    def _refresh_watermark(self, table: RyDBTable, watermark: Any) -> RefreshSummary:
+        column_name = self.watermarks[table.name]
+        query = f"SELECT * FROM {self.quote(table.name)} WHERE {self.quote(column_name)} > ?"
+        with self.connection() as conn:
+            rows = read_query(conn, query, self._to_param(watermark))
+        summary = self._merge(table, rows[table.columns] if len(rows) else rows)
+        if len(rows):
+            table.sync_point = ("watermark", max(watermark, rows[column_name].max()))
+        return summary
+
+    def _refresh_change_tracking(self, table: RyDBTable, version: int) -> RefreshSummary:
+        primary_key = table.primary_key
+        quote = self.quote
+        key_columns = ", ".join(f"ct.{quote(key)} AS {quote(f'_key_{key}')}" for key in primary_key)
+        join_clause = " AND ".join(f"t.{quote(key)} = ct.{quote(key)}" for key in primary_key)
+        query = f"""
+        SELECT ct.SYS_CHANGE_OPERATION AS _operation, {key_columns}, t.*
+        FROM CHANGETABLE(CHANGES {quote(table.name)}, ?) AS ct
+        LEFT JOIN {quote(table.name)} AS t ON {join_clause}
+        """
+        with self.connection() as conn:
+            current = self._scalar(conn, "SELECT CHANGE_TRACKING_CURRENT_VERSION()")
+            min_valid = self._scalar(
+                conn,
+                "SELECT CHANGE_TRACKING_MIN_VALID_VERSION(OBJECT_ID(?))",
+                table.name
+            )
+            if min_valid is not None and version < min_valid:
+                logging.warning(f"Change tracking for {table.name} expired; reloading it in full")
+                return super().refresh(table.name)
+            changes = read_query(conn, query, version)
+        present = changes[primary_key[0]].notna() if len(changes) else pd.Series(dtype=bool)
+        deleted_keys = changes.loc[~present, [f"_key_{key}" for key in primary_key]]
+        summary = self._merge(
+            table,
+            changes.loc[present, table.columns],
+            deleted_keys.set_axis(primary_key, axis=1)
+        )
+        table.sync_point = ("change_tracking", current)
+        return summary
+
+    def refresh(self, table_name: str) -> RefreshSummary:
+        table = self.conn[table_name]
+        mode, position = table.sync_point or (None, None)
+        if not table.primary_key or mode is None:
+            logging.warning(f"No key or sync point for {table_name}; reloading it in full")
+            summary = super().refresh(table_name)
+        elif mode == "change_tracking":
+            summary = self._refresh_change_tracking(table, position)
+        else:
+            summary = self._refresh_watermark(table, position)
+        logging.info(f"Refreshed {summary}")
+        return summary
+
     def commit(self):
-        if self.has_changed:
-            self._conn.commit()
+        dirty = [
+            table for table in self.conn.values()
+            if table.changes.is_dirty
+        ]
+        try:
+            for table in dirty:
+                self._commit_changes(table)
+                self.updated.add(table.name)
+            if self._conn is None:
+                return
+            if self.has_changed:
+                self._conn.commit()
+        except Exception:
+            if self._conn is not None:
+                self._conn.rollback()
+            raise
+        finally:
+            self.close()
+        for table in dirty:
+            table.changes.clear()
+
+    def close(self):
+        if self._conn is None:
+            return
+        self.pool.release(self._conn)
+        self._conn = None
 
     def execute(
             self,
             query: str,
             *values: Any
     ):
-        logging.info(f"Sending {query} with {values}")
-        self.curr.execute(
-            query,
-            *values
+        logging.debug(f"Sending {query} with {values}")
+        with self.measure("execute", query) as measurement, self.cursor() as curr:
+            curr.execute(
+                query,
+                *values
+            )
+            measurement.rows_out = max(curr.rowcount, 0)
+
+    @staticmethod
+    def _input_sizes(df: pd.DataFrame):
+        input_sizes = []
+        schema = TableSchema.from_frame("", df, sample_size=None, distinct=False)
+        for column in schema.columns:
+            if column.kind == "string":
+                size = max(column.max_length or 1, 1)
+                input_sizes.append((ODBC_TYPES[column.kind], 0 if size > 4000 else size, 0))
+                continue
+            if column.kind == "datetime":
+                input_sizes.append((ODBC_TYPES[column.kind], 27, 7))
+                continue
+            input_sizes.append((ODBC_TYPES[column.kind], 0, 0))
+        return input_sizes
+
+    def executemany(
+            self,
+            query: str,
+            df: pd.DataFrame,
+            chunksize: int = DEFAULT_CHUNKSIZE,
+            fast_executemany: bool = True
+    ):
+        logging.debug(f"Sending {query} for {len(df)} rows in chunks of {chunksize}")
+        with self.measure("executemany", query, rows_in=len(df)) as measurement, self.cursor() as curr:
+            measurement.nbytes = _nbytes(df)
+            curr.fast_executemany = fast_executemany
+            curr.setinputsizes(self._input_sizes(df))
+            for start in range(0, len(df), chunksize):
+                chunk = df.iloc[start:start + chunksize]
+                curr.executemany(query, self._to_params(chunk))
+
+    def create_table(
+            self,
+            table_name: str,
+            df: pd.DataFrame,
+            primary_key: List[str] = None
+    ):
+        schema = TableSchema.from_frame(table_name, df, primary_key=primary_key)
+        self.execute(schema.to_ddl("mssql"))
+        self.updated.add(table_name)
+        self.primary_keys[table_name] = primary_key
+        return schema
+
+    def insert_df(
+            self,
+            table_name: str,
+            df: pd.DataFrame,
+            chunksize: int = DEFAULT_CHUNKSIZE,
+            fast_executemany: bool = True
+    ):
+        if df.empty:
+            return 0
+        query = self._insert_query(table_name, df.columns.tolist())
+        self.executemany(query, df, chunksize=chunksize, fast_executemany=fast_executemany)
+        self.updated.add(table_name)
+        if table := self.conn.get(table_name):
+            with table.changes.suspended():
+                table.append_rows(df)
+        logging.info(f"Inserted {len(df)} rows into {table_name}")
+        return len(df)
+
+    def upsert_df(
+            self,
+            table_name: str,
+            df: pd.DataFrame,
+            on: Union[str, List[str]],
+            chunksize: int = DEFAULT_CHUNKSIZE,
+            staging: bool = True
+    ):
+        if df.empty:
+            return 0
+        on = [on] if isinstance(on, str) else list(on)
+        quote = self.quote
+        column_names = df.columns.tolist()
+        columns = ", ".join(quote(column) for column in column_names)
+        match_clause = " AND ".join(f"target.{quote(key)} = source.{quote(key)}" for key in on)
+        set_clause = ", ".join(
+            f"target.{quote(column)} = source.{quote(column)}"
+            for column in column_names
+            if column not in on
         )
+        when_matched = f"WHEN MATCHED THEN UPDATE SET {set_clause}" if set_clause else ""
+        merge_clause = f"""
+            ON {match_clause}
+            {when_matched}
+            WHEN NOT MATCHED THEN
+                INSERT ({columns})
+                VALUES ({", ".join(f"source.{quote(column)}" for column in column_names)});
+            """
+        if staging:
+            stage_name = f"#{re.sub(r'[^0-9A-Za-z_]', '_', table_name)}_stage"
+            self.execute(f"SELECT TOP 0 {columns} INTO {quote(stage_name)} FROM {quote(table_name)}")
+            try:
+                self.executemany(
+                    self._insert_query(stage_name, column_names),
+                    df,
+                    chunksize=chunksize
+                )
+                self.execute(
+                    f"MERGE {quote(table_name)} AS target USING {quote(stage_name)} AS source {merge_clause}"
+                )
+            finally:
+                self.execute(f"DROP TABLE {quote(stage_name)}")
+        else:
+            source_values = ", ".join(f"? AS {quote(column)}" for column in column_names)
+            self.executemany(
+                f"MERGE {quote(table_name)} AS target USING (SELECT {source_values}) AS source {merge_clause}",
+                df,
+                chunksize=chunksize
+            )
+        self.updated.add(table_name)
+        if table := self.conn.get(table_name):
+            with table.changes.suspended():
+                table.upsert_rows(df, on=on)
+        logging.info(f"Upserted {len(df)} rows into {table_name} on {', '.join(on)}")
+        return len(df)
 
     def update_row(
             self,
@@ -211,26 +1203,622 @@ class SQLDB(RyDBSource):
             _execute: bool = True,
             _replace: bool = False
     ):
-        super().update_row(table_name, set_dict=set_dict, where_dict=where_dict)
+        if table_name in self.conn:
+            with self.conn[table_name].changes.suspended(_execute or _replace):
+                super().update_row(table_name, set_dict=set_dict, where_dict=where_dict)
+        else:
+            self.updated.add(table_name)
         if _execute:
             logging.info("Updating server table")
-            set_clause = ", ".join(f"{set_key} = ?" for set_key in set_dict)
-            where_clause = ", ".join(f"{where_key} = ?" for where_key in where_dict)
+            set_clause = ", ".join(f"{self.quote(set_key)} = ?" for set_key in set_dict)
+            where_clause = self._where_clause(where_dict)
             values = [
                 *set_dict.values(),
                 *where_dict.values()
             ]
             query = f"""
                     UPDATE
-                        {table_name}
+                        {self.quote(table_name)}
                         SET {set_clause}
                         WHERE {where_clause}
                     """
             self.execute(query, *values)
         if _replace:
-            logging.info("Print replacing server table")
+            logging.info("Replacing server table")
             table = self.conn[table_name]
-            table.df.to_sql(table_name, con=self._conn, if_exists="replace")
+            self.execute(f"DELETE FROM {self.quote(table_name)}")
+            self.executemany(
+                self._insert_query(table_name, table.columns),
+                table.df
+            )
+            table.changes.clear()
+
+    def update_rows(
+            self,
+            table_name: str,
+            changes: pd.DataFrame,
+            on: Union[str, List[str]],
+            _execute: bool = True
+    ) -> UpdateSummary:
+        on = [on] if isinstance(on, str) else list(on)
+        if table_name not in self.conn:
+            # Without the table in memory there is nothing to diff against,
+            # so every row is sent and counted as changed.
+            summary = UpdateSummary(matched=len(changes), changed=len(changes), unmatched=0, diff=changes)
+            self.updated.add(table_name)
+        else:
+            with self.conn[table_name].changes.suspended(_execute):
+                summary = super().update_rows(table_name, changes, on=on)
+        if _execute and summary.changed:
+            set_columns = [column for column in summary.diff.columns if column not in on]
+            set_clause = ", ".join(f"{self.quote(set_column)} = ?" for set_column in set_columns)
+            where_clause = self._where_clause(on)
+            query = f"""
+                    UPDATE
+                        {self.quote(table_name)}
+                        SET {set_clause}
+                        WHERE {where_clause}
+                    """
+            self.executemany(query, summary.diff[set_columns + on])
+        return summary
+
+    def append_rows(self, table_name: str, rows: pd.DataFrame):
+        if table_name in self.conn:
+            return super().append_rows(table_name, rows)
+        self.insert_df(table_name, rows)
+
+    def delete_rows(self, table_name: str, where_dict: dict) -> int:
+        if table_name in self.conn:
+            return super().delete_rows(table_name, where_dict)
+        self.updated.add(table_name)
+        with self.measure("delete", table_name) as measurement, self.cursor() as curr:
+            curr.execute(
+                f"DELETE FROM {self.quote(table_name)} WHERE {self._where_clause(where_dict)}",
+                *where_dict.values()
+            )
+            measurement.rows_out = max(curr.rowcount, 0)
+        return measurement.rows_out
+
+
+class SQLiteDB(SQLSource):
+    def __init__(
+            self,
+            path: Union[str, Path] = ":memory:",
+            load: bool = True,
+            compact: bool = False
+    ):
+        super().__init__(type="sqlite", compact=compact)
+        self.path = path
+        self.load = load
+        self.primary_keys = {}
+        self.generated_columns = {}
+        self.sqlite = self.connect()
+        self.conn = self.collect_all()
+
+    def connect(self):
+        conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        if str(self.path) != ":memory:":
+            conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    @staticmethod
+    def quote(name: str) -> str:
+        return '"{}"'.format(name.replace('"', '""'))
+
+    @contextmanager
+    def cursor(self):
+        curr = self.sqlite.cursor()
+        try:
+            yield curr
+        finally:
+            curr.close()
+
+    def execute(self, query: str, *values: Any) -> int:
+        logging.debug(f"Sending {query} with {values}")
+        with self.measure("execute", query) as measurement, self.cursor() as curr:
+            curr.execute(query, values)
+            measurement.rows_out = max(curr.rowcount, 0)
+            return curr.rowcount
+
+    @staticmethod
+    def _to_sqlite(df: pd.DataFrame) -> pd.DataFrame:
+        datetime_columns = [
+            column_name for column_name in df.columns
+            if pd.api.types.is_datetime64_any_dtype(df[column_name])
+        ]
+        if not datetime_columns:
+            return df
+        df = df.copy()
+        for column_name in datetime_columns:
+            df[column_name] = df[column_name].dt.strftime("%Y-%m-%d %H:%M:%S.%f")
+        return df
+
+    def executemany(
+            self,
+            query: str,
+            df: pd.DataFrame,
+            chunksize: int = DEFAULT_CHUNKSIZE
+    ) -> int:
+        logging.debug(f"Sending {query} for {len(df)} rows in chunks of {chunksize}")
+        df = self._to_sqlite(df)
+        rowcount = 0
+        with self.measure("executemany", query, rows_in=len(df)) as measurement, self.cursor() as curr:
+            measurement.nbytes = _nbytes(df)
+            for start in range(0, len(df), chunksize):
+                curr.executemany(query, self._to_params(df.iloc[start:start + chunksize]))
+                rowcount += curr.rowcount
+            measurement.rows_out = rowcount
+        return rowcount
+
+    def read_query(self, query: str, *params: Any) -> pd.DataFrame:
+        with self.measure("query", query) as measurement:
+            df = pd.read_sql(query, self.sqlite, params=params or None)
+            measurement.rows_out = len(df)
+            measurement.nbytes = _nbytes(df)
+        return df
+
+    def list_tables(self) -> List[str]:
+        query = """
+        SELECT name FROM sqlite_master
+        WHERE type = 'table' AND name NOT LIKE 'sqlite_%'
+        ORDER BY name;
+        """
+        return self.read_query(query).name.tolist()
+
+    def _table_info(self, table_name: str) -> pd.DataFrame:
+        return self.read_query(f"PRAGMA table_info({self.quote(table_name)})")
+
+    def list_primary_keys(self) -> Dict[str, List[str]]:
+        primary_keys = {}
+        for table_name in self.list_tables():
+            info = self._table_info(table_name)
+            if primary_key := info[info.pk > 0].sort_values("pk").name.tolist():
+                primary_keys[table_name] = primary_key
+        return primary_keys
+
+    def _columns(self, table_name: str) -> List[str]:
+        if table_name in self.conn:
+            return super()._columns(table_name)
+        return self._table_info(table_name).name.tolist()
+
+    def _timestamp_columns(self, table_name: str) -> List[str]:
+        info = self._table_info(table_name)
+        return info[info.type.str.upper() == "TIMESTAMP"].name.tolist()
+
+    def catalog(self) -> Catalog:
+        columns = self.read_query(
+            """
+            SELECT m.name as table_name,
+                p.name as column_name,
+                p.type as data_type,
+                p.pk as pk
+            FROM sqlite_master m
+            JOIN pragma_table_info(m.name) p
+            WHERE m.type = 'table' AND m.name NOT LIKE 'sqlite_%'
+            ORDER BY m.name, p.cid;
+            """
+        )
+        foreign_keys = self.read_query(
+            """
+            SELECT m.name as table_name,
+                p.id as constraint_name,
+                p."from" as column_name,
+                p."table" as referenced_table,
+                p."to" as referenced_column
+            FROM sqlite_master m
+            JOIN pragma_foreign_key_list(m.name) p
+            WHERE m.type = 'table' AND m.name NOT LIKE 'sqlite_%'
+            ORDER BY m.name, p.id, p.seq;
+            """
+        )
+        primary_keys = columns[columns.pk > 0].sort_values(["table_name", "pk"])
+        return Catalog.from_frames(
+            columns,
+            primary_keys.groupby("table_name", sort=False).column_name.agg(list).to_dict(),
+            foreign_keys
+        )
+
+    def _parse_timestamps(self, table_name: str, df: pd.DataFrame) -> pd.DataFrame:
+        for column_name in self._timestamp_columns(table_name):
+            if column_name in df.columns:
+                df[column_name] = pd.to_datetime(df[column_name])
+        return df
+
+    def _push_down(self, plan: JoinPlan) -> pd.DataFrame:
+        df = super()._push_down(plan)
+        timestamps = {
+            "left": set(self._timestamp_columns(plan.left)),
+            "right": set(self._timestamp_columns(plan.right))
+        }
+        timestamps["key"] = timestamps["left"]
+        for label, side, column in plan.projection:
+            if column in timestamps[side]:
+                df[label] = pd.to_datetime(df[label])
+        return df
+
+    def _read_table(self, table_name: str) -> pd.DataFrame:
+        return self._parse_timestamps(
+            table_name,
+            self.read_query(f"SELECT * FROM {self.quote(table_name)}")
+        )
+
+    def collect_table(self, table_name: str):
+        return self._loaded(
+            RyDBTable(
+                table_name,
+                self._read_table(table_name),
+                primary_key=self.primary_keys.get(table_name)
+            )
+        )
+
+    def collect_all(self):
+        self.primary_keys = self.list_primary_keys()
+        if not self.load:
+            return {}
+        return {
+            table_name: self.collect_table(table_name)
+            for table_name in self.list_tables()
+        }
+
+    def create_table(
+            self,
+            table_name: str,
+            df: pd.DataFrame,
+            primary_key: List[str] = None,
+            if_exists: str = "fail"
+    ) -> TableSchema:
+        if if_exists == "replace":
+            self.execute(f"DROP TABLE IF EXISTS {self.quote(table_name)}")
+        schema = TableSchema.from_frame(table_name, df, primary_key=primary_key, distinct=False)
+        self.execute(schema.to_ddl("sqlite"))
+        self.primary_keys[table_name] = primary_key
+        self.updated.add(table_name)
+        return schema
+
+    def create_index(
+            self,
+            table_name: str,
+            columns: Union[str, List[str]],
+            unique: bool = False
+    ):
+        columns = [columns] if isinstance(columns, str) else list(columns)
+        index_name = self.quote(f"ix_{table_name}_{'_'.join(columns)}")
+        self.execute(
+            f"CREATE {'UNIQUE ' if unique else ''}INDEX IF NOT EXISTS {index_name} "
+            f"ON {self.quote(table_name)} ({', '.join(self.quote(column) for column in columns)})"
+        )
+        if table := self.conn.get(table_name):
+            table.create_index(columns, unique=unique)
+
+    def insert_df(self, table_name: str, df: pd.DataFrame, chunksize: int = DEFAULT_CHUNKSIZE) -> int:
+        if df.empty:
+            return 0
+        query = self._insert_query(table_name, df.columns.tolist())
+        self.executemany(query, df, chunksize=chunksize)
+        self.updated.add(table_name)
+        return len(df)
+
+    def mirror(
+            self,
+            source: RyDBSource,
+            table_names: List[str] = None,
+            chunksize: int = DEFAULT_CHUNKSIZE
+    ):
+        for table_name, table in source.conn.items():
+            if table_names is not None and table_name not in table_names:
+                continue
+            self.create_table(table_name, table.df, primary_key=table.primary_key, if_exists="replace")
+            self.insert_df(table_name, table.df, chunksize=chunksize)
+            logging.info(f"Mirrored {table.shape[0]} rows of {table_name} from {source.type}")
+        self.sqlite.commit()
+        self.updated.clear()
+        self.conn = self.collect_all()
+
+    def _page_query(self, table_name: str, offset: int, count: int, where_clause: str) -> str:
+        order_by = ", ".join(self.quote(key) for key in self.primary_keys.get(table_name) or [])
+        where = f" WHERE {where_clause}" if where_clause else ""
+        order = f" ORDER BY {order_by}" if order_by else ""
+        return f"SELECT * FROM {self.quote(table_name)}{where}{order} LIMIT {count} OFFSET {offset}"
+
+    def fetch_page(
+            self,
+            table_name: str,
+            offset: int = 0,
+            count: int = DEFAULT_PAGE_SIZE,
+            where_dict: dict = None
+    ) -> pd.DataFrame:
+        rows = super().fetch_page(table_name, offset=offset, count=count, where_dict=where_dict)
+        if table_name in self.conn:
+            return rows
+        return self._parse_timestamps(table_name, rows)
+
+    def lookup(
+            self,
+            table_name: str,
+            where_dict: dict,
+            column_names: List[str] = None
+    ) -> pd.DataFrame:
+        if table_name in self.conn:
+            return super().lookup(table_name, where_dict, column_names)
+        columns = "*" if column_names is None else ", ".join(self.quote(column) for column in column_names)
+        query = f"SELECT {columns} FROM {self.quote(table_name)} WHERE {self._where_clause(where_dict)}"
+        return self._parse_timestamps(table_name, self.read_query(query, *where_dict.values()))
+
+    def update_row(
+            self,
+            table_name: str,
+            set_dict: dict,
+            where_dict: dict
+    ):
+        set_clause = ", ".join(f"{self.quote(set_key)} = ?" for set_key in set_dict)
+        updated = self.execute(
+            f"UPDATE {self.quote(table_name)} SET {set_clause} WHERE {self._where_clause(where_dict)}",
+            *set_dict.values(),
+            *where_dict.values()
+        )
+        self.updated.add(table_name)
+        if table := self.conn.get(table_name):
+            with table.changes.suspended():
+                table.update_row(set_dict=set_dict, where_dict=where_dict)
+        logging.info(f"Updated {updated} rows of {table_name}")
+        return updated
+
+    def update_rows(
+            self,
+            table_name: str,
+            changes: pd.DataFrame,
+            on: Union[str, List[str]]
+    ) -> UpdateSummary:
+        if table_name in self.conn:
+            return super().update_rows(table_name, changes, on)
+        on = [on] if isinstance(on, str) else list(on)
+        set_columns = [column for column in changes.columns if column not in on]
+        set_clause = ", ".join(f"{self.quote(set_column)} = ?" for set_column in set_columns)
+        where_clause = " AND ".join(f"{self.quote(key)} = ?" for key in on)
+        changed = self.executemany(
+            f"UPDATE {self.quote(table_name)} SET {set_clause} WHERE {where_clause}",
+            changes[set_columns + on]
+        )
+        self.updated.add(table_name)
+        return UpdateSummary(
+            matched=changed,
+            changed=changed,
+            unmatched=len(changes) - changed,
+            diff=changes
+        )
+
+    def append_rows(self, table_name: str, rows: pd.DataFrame):
+        if table_name in self.conn:
+            return super().append_rows(table_name, rows)
+        self.insert_df(table_name, rows)
+
+    def delete_rows(self, table_name: str, where_dict: dict) -> int:
+        if table_name in self.conn:
+            return super().delete_rows(table_name, where_dict)
+        self.updated.add(table_name)
+        return self.execute(
+            f"DELETE FROM {self.quote(table_name)} WHERE {self._where_clause(where_dict)}",
+            *where_dict.values()
+        )
+
+    def commit(self):
+        dirty = [
+            table for table in self.conn.values()
+            if table.changes.is_dirty
+        ]
+        try:
+            for table in dirty:
+                self._commit_changes(table)
+            self.sqlite.commit()
+        except Exception:
+            self.sqlite.rollback()
+            raise
+        for table in dirty:
+            table.changes.clear()
+        self.updated.clear()
+
+    def close(self):
+        self.sqlite.close()
+
+
+class SharepointListDB(RyDBSource):
+    """
+    Reads SharePoint lists item by item through the Graph list API, with
+    per-list `select` projections and OData `filters` applied server-side,
+    and commits row changes as individual item creates, updates and deletes.
+    """
+    def __init__(
+            self,
+            site: Union[str, Site],
+            list_names: List[str] = None,
+            select: Dict[str, List[str]] = None,
+            filters: Dict[str, str] = None,
+            page_size: int = None,
+            load: bool = True,
+            compact: bool = False
+    ):
+        super().__init__(type="sharepoint", compact=compact)
+        self.site = O365Account(site=site).site if isinstance(site, str) else site
+        self.select = select or {}
+        self.filters = filters or {}
+        self.page_size = page_size
+        self.lists: Dict[str, SharepointList] = {}
+        self.list_names = list_names or self.list_tables()
+        self.conn = self.collect_all() if load else {}
+
+    def list_tables(self) -> List[str]:
+        return [sharepoint_list.display_name for sharepoint_list in self.site.get_lists()]
+
+    def get_list(self, list_name: str) -> SharepointList:
+        if list_name not in self.lists:
+            self.lists[list_name] = self.site.get_list_by_name(list_name)
+        return self.lists[list_name]
+
+    @staticmethod
+    def _to_frame(items: List[dict], select: List[str] = None) -> pd.DataFrame:
+        records = [
+            {
+                "id": item["id"],
+                **{
+                    field: value
+                    for field, value in item.get("fields", {}).items()
+                    if field != "id" and not field.startswith("@odata")
+                }
+            }
+            for item in items
+        ]
+        columns = ["id", *(field for field in select if field != "id")] if select else None
+        return pd.DataFrame.from_records(records, columns=columns)
+
+    @staticmethod
+    def _literal(value: Any) -> str:
+        if isinstance(value, (bool, np.bool_)):
+            return str(bool(value)).lower()
+        if isinstance(value, (int, float, np.number)):
+            return str(value)
+        if isinstance(value, pd.Timestamp):
+            value = value.isoformat()
+        return "'{}'".format(str(value).replace("'", "''"))
+
+    def _filter(self, where_dict: dict) -> str:
+        return " and ".join(
+            f"fields/{field} eq {self._literal(value)}"
+            for field, value in where_dict.items()
+        )
+
+    def query(
+            self,
+            list_name: str,
+            query: str = None,
+            select: List[str] = None,
+            order_by: str = None
+    ) -> pd.DataFrame:
+        select = select or self.select.get(list_name)
+        with self.measure("query", f"{list_name} {query or ''}") as measurement:
+            items = []
+            for page in self.get_list(list_name).iter_item_pages(
+                    select=select,
+                    query=query,
+                    order_by=order_by,
+                    page_size=self.page_size
+            ):
+                items.extend(page)
+            df = self._to_frame(items, select)
+            measurement.rows_out = len(df)
+            measurement.nbytes = _nbytes(df)
+        return df
+
+    def collect_table(self, table_name: str):
+        table = RyDBTable(
+            table_name,
+            self.query(table_name, query=self.filters.get(table_name)),
+            primary_key=["id"]
+        )
+        table.create_index("id", unique=True)
+        return self._loaded(table)
+
+    def collect_all(self):
+        return {
+            table_name: self.collect_table(table_name)
+            for table_name in self.list_names
+        }
+
+    def lookup(
+            self,
+            table_name: str,
+            where_dict: dict,
+            column_names: List[str] = None
+    ) -> pd.DataFrame:
+        if table_name in self.conn:
+            return super().lookup(table_name, where_dict, column_names)
+        df = self.query(table_name, query=self._filter(where_dict), select=column_names)
+        return df if column_names is None else df[column_names]
+
+    @staticmethod
+    def _to_field_value(value: Any):
+        if isinstance(value, (list, dict)):
+            return value
+        if pd.isna(value):
+            return None
+        if isinstance(value, pd.Timestamp):
+            return value.isoformat()
+        if isinstance(value, np.generic):
+            return value.item()
+        return value
+
+    def _fields(self, row: pd.Series, columns: List[str]) -> dict:
+        return {
+            column: self._to_field_value(row[column])
+            for column in columns
+            if column != "id"
+        }
+
+    def _commit_changes(self, table: RyDBTable):
+        sharepoint_list = self.get_list(table.name)
+        changes = table.changes
+        deleted, updated, created = len(changes.deleted), len(changes.updated), {}
+        for label, (item_id,) in list(changes.deleted.items()):
+            sharepoint_list.delete_list_item(item_id)
+            del changes.deleted[label]
+        for label, columns in list(changes.updated.items()):
+            row = table.df.loc[label]
+            item_id = changes.original_keys.get(label, (row["id"],))[0]
+            sharepoint_list.update_item_fields(item_id, self._fields(row, sorted(columns)))
+            del changes.updated[label]
+            changes.original_keys.pop(label, None)
+        try:
+            for label in list(changes.inserted):
+                row = table.df.loc[label]
+                item = sharepoint_list.create_item_fields(
+                    self._fields(row, [column for column in table.columns if pd.notna(row[column])])
+                )
+                created[label] = item.get("id")
+        finally:
+            if created:
+                with changes.suspended():
+                    table.set_values(list(created), "id", list(created.values()))
+                changes.inserted.difference_update(created)
+        logging.info(
+            f"Committed {len(created)} created, {updated} updated "
+            f"and {deleted} deleted items to {table.name}"
+        )
+
+    def commit(self):
+        for table in self.conn.values():
+            if table.changes.is_dirty:
+                self._commit_changes(table)
+        self.updated.clear()
+
+
+class SnapshotSource(RyDBSource):
+    def __init__(self, path: Union[str, Path]):
+        super().__init__(type="snapshot")
+        self.path = Path(path)
+        self.version = None
+        self.conn = self.collect_all()
+
+    def collect_all(self):
+        self.version, tables = read_snapshot(self.path)
+        logging.info(f"Attached snapshot {self.version} from {self.path}")
+        return tables
+
+    def collect_table(self, table_name: str):
+        return self.conn.get(table_name)
+
+    @property
+    def is_stale(self):
+        return read_manifest(self.path)["version"] != self.version
+
+    def reattach(self) -> bool:
+        if not self.is_stale:
+            return False
+        self.conn = self.collect_all()
+        return True
+
+    def _read_only(self, *args, **kwargs):
+        raise PermissionError(f"Snapshot {self.path} is read-only!")
+
+    update_row = update_rows = append_rows = delete_rows = replace = _read_only
 
 
 class RyDB:
@@ -242,6 +1830,7 @@ class RyDB:
     ):
         self.source = source
         self.read_only = read_only
+        self.write_behind = None
         if collect_all:
             self.source.collect_all()
         self.conn = self.source.conn
@@ -253,11 +1842,73 @@ class RyDB:
         return self
 
     def __exit__(self, type, value, traceback):
-        if not self.read_only:
+        if self.write_behind is not None:
+            self.write_behind.close()
+        elif not self.read_only:
             self.commit()
+        self.source.close()
 
     def commit(self):
-        self.source.commit()
+        if self.write_behind is not None:
+            return self.write_behind.flush()
+        with self.source.measure("commit"):
+            self.source.commit()
+
+    def instrument(self, *sinks: Sink, slow_threshold: float = None) -> Instrumentation:
+        for sink in sinks:
+            self.source.instrumentation.add_sink(sink)
+        if slow_threshold is not None:
+            self.source.instrumentation.slow_threshold = slow_threshold
+        return self.source.instrumentation
+
+    @contextmanager
+    def transaction(self, table_names: List[str] = None) -> Iterator[Transaction]:
+        """
+        Snapshots the loaded tables and rolls them back if the block raises.
+        Only in-memory tables are restored; statements a source has already
+        sent to its server are left to that source's own transaction.
+        """
+        if self.write_behind is not None:
+            raise RuntimeError("Cannot open a transaction while write-behind is journaling writes!")
+        tables = self.source.conn if table_names is None else {
+            table_name: self.source.conn[table_name]
+            for table_name in table_names
+        }
+        transaction = Transaction(tables, updated=self.source.updated)
+        try:
+            yield transaction
+        except Exception:
+            transaction.rollback()
+            raise
+        finally:
+            transaction.release()
+
+    def enable_write_behind(
+            self,
+            journal_path: Union[str, Path],
+            max_pending: int = 1_000,
+            flush_interval: float = None,
+            fsync: bool = True
+    ) -> WriteBehind:
+        if self.read_only:
+            raise PermissionError("Cannot enable write-behind on a read-only RyDB!")
+        self.write_behind = WriteBehind(
+            self.source,
+            journal_path,
+            max_pending=max_pending,
+            flush_interval=flush_interval,
+            fsync=fsync
+        )
+        return self.write_behind
+
+    def flush(self):
+        if self.write_behind is not None:
+            self.write_behind.flush()
+
+    def _write(self, op: str, table_name: str, **payload):
+        if self.write_behind is not None:
+            return self.write_behind.apply(op, table_name, **payload)
+        return getattr(self.source, op)(table_name, **payload)
 
     def collect_table(self, table_name: str):
         return self.source.collect_table(table_name)
@@ -270,14 +1921,20 @@ class RyDB:
             cls,
             site: str,
             filepath: Union[str, List[str]],
-            db_filename: str
+            db_filename: str,
+            compact: bool = False,
+            parse_workers: int = None,
+            cache_dir: Union[str, Path, None] = DEFAULT_CACHE_DIR
     ):
         SOURCE = O365DB(
             site=site,
             filepath=filepath,
-            db_filename=db_filename
+            db_filename=db_filename,
+            compact=compact,
+            parse_workers=parse_workers,
+            cache_dir=cache_dir
         )
-        return cls(source=SOURCE)
+        return cls(source=SOURCE, collect_all=False)
 
     @classmethod
     def read_sql(
@@ -288,7 +1945,13 @@ class RyDB:
             database: str,
             port: str = 1433,
             driver: str = "{ODBC Driver 17 for SQL Server}",
-            engine: str = "pyodbc"
+            engine: str = "pyodbc",
+            min_pool_size: int = 1,
+            max_pool_size: int = 10,
+            max_workers: int = 8,
+            load: bool = True,
+            compact: bool = False,
+            watermarks: Dict[str, str] = None
     ):
         SOURCE = SQLDB(
             username,
@@ -297,9 +1960,103 @@ class RyDB:
             database=database,
             port=port,
             driver=driver,
-            engine=engine
+            engine=engine,
+            min_pool_size=min_pool_size,
+            max_pool_size=max_pool_size,
+            max_workers=max_workers,
+            load=load,
+            compact=compact,
+            watermarks=watermarks
+        )
+        return cls(source=SOURCE, collect_all=False)
+
+    @classmethod
+    def read_sharepoint_list(
+            cls,
+            site: Union[str, Site],
+            list_names: List[str] = None,
+            select: Dict[str, List[str]] = None,
+            filters: Dict[str, str] = None,
+            page_size: int = None
+    ):
+        SOURCE = SharepointListDB(
+            site,
+            list_names=list_names,
+            select=select,
+            filters=filters,
+            page_size=page_size
         )
-        return cls(source=SOURCE)
+        return cls(source=SOURCE, collect_all=False)
+
+    @classmethod
+    def read_sqlite(
+            cls,
+            path: Union[str, Path] = ":memory:",
+            load: bool = True,
+            compact: bool = False
+    ):
+        SOURCE = SQLiteDB(path, load=load, compact=compact)
+        return cls(source=SOURCE, collect_all=False)
+
+    def to_sqlite(
+            self,
+            path: Union[str, Path],
+            table_names: List[str] = None,
+            load: bool = True
+    ):
+        SOURCE = SQLiteDB(path, load=load)
+        SOURCE.mirror(self.source, table_names=table_names)
+        return type(self)(source=SOURCE, collect_all=False)
+
+    def lookup(self, table_name: str, where_dict: dict, column_names: List[str] = None):
+        return self.source.lookup(table_name, where_dict, column_names)
+
+    def join(
+            self,
+            left: str,
+            right: str,
+            on: Union[str, List[str]],
+            columns: List[str] = None,
+            how: str = "inner"
+    ) -> pd.DataFrame:
+        return self.source.join(left, right, on, columns=columns, how=how)
+
+    def to_mermaid(self) -> erDiagram:
+        return self.source.catalog().to_mermaid()
+
+    def page(
+            self,
+            table_name: str,
+            count: int = DEFAULT_PAGE_SIZE,
+            where_dict: dict = None,
+            column_formats: dict = None,
+            fillna: str = ""
+    ) -> TablePager:
+        return TablePager(
+            self.source,
+            table_name,
+            count=count,
+            where_dict=where_dict,
+            column_formats=column_formats,
+            fillna=fillna
+        )
+
+    def refresh(self, table_name: str) -> RefreshSummary:
+        return self.source.refresh(table_name)
+
+    @classmethod
+    def attach_snapshot(cls, path: Union[str, Path]):
+        return cls(source=SnapshotSource(path), read_only=True, collect_all=False)
+
+    def snapshot(self, path: Union[str, Path], keep: int = 2) -> str:
+        return write_snapshot(path, self.source.conn, keep=keep)
+
+    def refresh_snapshot(self) -> bool:
+        if not isinstance(self.source, SnapshotSource):
+            raise TypeError(f"{type(self.source).__name__} is not a snapshot source!")
+        if refreshed := self.source.reattach():
+            self.conn = self.source.conn
+        return refreshed
 
     def replace(self):
         self.source.replace(
@@ -314,4 +2071,18 @@ class RyDB:
         return
 
     def update_row(self, table_name: str, set_dict: dict, where_dict: dict):
-        self.source.update_row(table_name, set_dict, where_dict)
+        self._write("update_row", table_name, set_dict=set_dict, where_dict=where_dict)
+
+    def update_rows(
+            self,
+            table_name: str,
+            changes: pd.DataFrame,
+            on: Union[str, List[str]]
+    ) -> UpdateSummary:
+        return self._write("update_rows", table_name, changes=changes, on=on)
+
+    def append_rows(self, table_name: str, rows: pd.DataFrame):
+        self._write("append_rows", table_name, rows=rows)
+
+    def delete_rows(self, table_name: str, where_dict: dict) -> int:
+        return self._write("delete_rows", table_name, where_dict=where_dict)
@@ -0,0 +1,129 @@
+import datetime
+import decimal
+from typing import Any, Iterator, List, Sequence
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_BATCH_SIZE = 50_000
+EPOCH = datetime.datetime(1970, 1, 1)
+MICROSECOND = datetime.timedelta(microseconds=1)
+NAT = np.iinfo(np.int64).min
+NS_RANGE = (pd.Timestamp.min.value // 1000 + 1, pd.Timestamp.max.value // 1000)
+
+COLUMN_TYPES = {
+    bool: (np.bool_, False, None),
+    int: (np.int64, 0, None),
+    float: (np.float64, np.nan, None),
+    decimal.Decimal: (np.float64, np.nan, None),
+    datetime.datetime: (np.int64, NAT, lambda value: (value - EPOCH) // MICROSECOND)
+}
+
+
+class ColumnBuffer:
+    def __init__(self, name: str, type_code: Any, capacity: int = DEFAULT_BATCH_SIZE):
+        self.name = name
+        self.type_code = type_code
+        self.dtype, self.fill, self.convert = COLUMN_TYPES.get(type_code, (object, None, None))
+        self.values = np.empty(capacity, dtype=self.dtype)
+        self.mask = np.zeros(capacity, dtype=bool)
+        self.length = 0
+
+    def _reserve(self, count: int):
+        if self.length + count <= len(self.values):
+            return
+        capacity = max(len(self.values) * 2, self.length + count)
+        values = np.empty(capacity, dtype=self.dtype)
+        values[:self.length] = self.values[:self.length]
+        mask = np.zeros(capacity, dtype=bool)
+        mask[:self.length] = self.mask[:self.length]
+        self.values, self.mask = values, mask
+
+    def extend(self, column: Sequence):
+        count = len(column)
+        self._reserve(count)
+        start, end = self.length, self.length + count
+        self.length = end
+        if self.dtype is object:
+            self.values[start:end] = column
+            return
+        fill, convert = self.fill, self.convert
+        if not column.count(None):
+            values = column if convert is None else map(convert, column)
+            self.values[start:end] = np.fromiter(values, dtype=self.dtype, count=count)
+            return
+        self.mask[start:end] = np.fromiter((value is None for value in column), dtype=bool, count=count)
+        if convert is None:
+            values = (fill if value is None else value for value in column)
+        else:
+            values = (fill if value is None else convert(value) for value in column)
+        self.values[start:end] = np.fromiter(values, dtype=self.dtype, count=count)
+
+    @staticmethod
+    def _datetimes(values: np.ndarray, mask: np.ndarray) -> np.ndarray:
+        """
+        Nanosecond datetimes where every value fits, otherwise datetime.datetime
+        objects, so sentinels like 9999-12-31 survive instead of wrapping.
+        """
+        valid = values[~mask]
+        datetimes = values.view("datetime64[us]")
+        if not valid.size or (NS_RANGE[0] <= valid.min() and valid.max() <= NS_RANGE[1]):
+            return datetimes.astype("datetime64[ns]")
+        return datetimes.astype(object)
+
+    def to_array(self):
+        values = self.values[:self.length]
+        mask = self.mask[:self.length]
+        if self.type_code is datetime.datetime:
+            return self._datetimes(values, mask)
+        if mask.any() and self.dtype == np.int64:
+            return pd.arrays.IntegerArray(values, mask)
+        if mask.any() and self.dtype == np.bool_:
+            return pd.arrays.BooleanArray(values, mask)
+        return values
+
+
+def _buffers(description: Sequence, capacity: int) -> List[ColumnBuffer]:
+    return [
+        ColumnBuffer(column[0], column[1], capacity=capacity)
+        for column in description
+    ]
+
+
+def _to_frame(buffers: List[ColumnBuffer]) -> pd.DataFrame:
+    return pd.DataFrame(
+        {buffer.name: buffer.to_array() for buffer in buffers},
+        columns=[buffer.name for buffer in buffers]
+    )
+
+
+def _extend(buffers: List[ColumnBuffer], rows: List[Sequence]):
+    for buffer, column in zip(buffers, zip(*rows)):
+        buffer.extend(column)
+
+
+def iter_batches(cursor, batch_size: int = DEFAULT_BATCH_SIZE) -> Iterator[pd.DataFrame]:
+    if cursor.description is None:
+        return
+    while rows := cursor.fetchmany(batch_size):
+        buffers = _buffers(cursor.description, len(rows))
+        _extend(buffers, rows)
+        yield _to_frame(buffers)
+
+
+def read_cursor(cursor, batch_size: int = DEFAULT_BATCH_SIZE) -> pd.DataFrame:
+    if cursor.description is None:
+        return pd.DataFrame()
+    buffers = _buffers(cursor.description, batch_size)
+    while rows := cursor.fetchmany(batch_size):
+        _extend(buffers, rows)
+    return _to_frame(buffers)
+
+
+def read_query(conn, query: str, *params: Any, batch_size: int = DEFAULT_BATCH_SIZE) -> pd.DataFrame:
+    curr = conn.cursor()
+    try:
+        curr.execute(query, *params)
+        return read_cursor(curr, batch_size=batch_size)
+    finally:
+        curr.close()
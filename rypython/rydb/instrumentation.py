@@ -0,0 +1,155 @@
+import json
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, asdict, field
+from pathlib import Path
+from typing import Dict, List, Tuple, Union
+
+
+@dataclass
+class Measurement:
+    source: str
+    operation: str
+    target: str = ""
+    started: float = field(default_factory=time.time)
+    duration: float = 0.0
+    rows_in: int = 0
+    rows_out: int = 0
+    nbytes: int = 0
+    cache_hit: bool = None
+    error: str = None
+    slow: bool = False
+
+
+@dataclass
+class OperationStats:
+    count: int = 0
+    total_seconds: float = 0.0
+    max_seconds: float = 0.0
+    rows_in: int = 0
+    rows_out: int = 0
+    nbytes: int = 0
+    cache_hits: int = 0
+    cache_misses: int = 0
+    errors: int = 0
+    slow: int = 0
+
+    @property
+    def mean_seconds(self):
+        return self.total_seconds / self.count if self.count else 0.0
+
+    def add(self, measurement: Measurement):
+        self.count += 1
+        self.total_seconds += measurement.duration
+        self.max_seconds = max(self.max_seconds, measurement.duration)
+        self.rows_in += measurement.rows_in
+        self.rows_out += measurement.rows_out
+        self.nbytes += measurement.nbytes
+        if measurement.cache_hit is not None:
+            self.cache_hits += measurement.cache_hit
+            self.cache_misses += not measurement.cache_hit
+        self.errors += measurement.error is not None
+        self.slow += measurement.slow
+
+
+class Sink:
+    def record(self, measurement: Measurement):
+        ...
+
+
+class MemorySink(Sink):
+    def __init__(self):
+        self.stats: Dict[Tuple[str, str], OperationStats] = {}
+        self._lock = threading.Lock()
+
+    def record(self, measurement: Measurement):
+        with self._lock:
+            self.stats.setdefault(
+                (measurement.source, measurement.operation),
+                OperationStats()
+            ).add(measurement)
+
+    def reset(self):
+        with self._lock:
+            self.stats.clear()
+
+
+class JSONLinesSink(Sink):
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+
+    def record(self, measurement: Measurement):
+        line = json.dumps(asdict(measurement), default=str)
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+
+
+class PrometheusSink(MemorySink):
+    METRICS = (
+        ("rydb_operations_total", "counter", "count"),
+        ("rydb_operation_seconds_sum", "counter", "total_seconds"),
+        ("rydb_operation_seconds_max", "gauge", "max_seconds"),
+        ("rydb_rows_in_total", "counter", "rows_in"),
+        ("rydb_rows_out_total", "counter", "rows_out"),
+        ("rydb_bytes_total", "counter", "nbytes"),
+        ("rydb_cache_hits_total", "counter", "cache_hits"),
+        ("rydb_cache_misses_total", "counter", "cache_misses"),
+        ("rydb_errors_total", "counter", "errors"),
+        ("rydb_slow_operations_total", "counter", "slow")
+    )
+
+    def render(self) -> str:
+        with self._lock:
+            stats = dict(self.stats)
+        lines = []
+        for metric, metric_type, attribute in self.METRICS:
+            lines.append(f"# TYPE {metric} {metric_type}")
+            for (source, operation), operation_stats in sorted(stats.items()):
+                lines.append(
+                    f'{metric}{{source="{source}",operation="{operation}"}} '
+                    f"{getattr(operation_stats, attribute)}"
+                )
+        return "\n".join(lines) + "\n"
+
+    def write(self, path: Union[str, Path]):
+        Path(path).write_text(self.render())
+
+
+class Instrumentation:
+    def __init__(self, sinks: List[Sink] = None, slow_threshold: float = None):
+        self.sinks = list(sinks or [])
+        self.slow_threshold = slow_threshold
+
+    def add_sink(self, sink: Sink) -> Sink:
+        self.sinks.append(sink)
+        return sink
+
+    def _dispatch(self, measurement: Measurement):
+        for sink in self.sinks:
+            try:
+                sink.record(measurement)
+            except Exception as e:
+                logging.error(f"Could not record {measurement.operation} to {type(sink).__name__}: {e}")
+
+    @contextmanager
+    def measure(self, source: str, operation: str, target: str = "", rows_in: int = 0):
+        target = " ".join(str(target).split())[:500]
+        measurement = Measurement(source, operation, target=target, rows_in=rows_in)
+        start = time.perf_counter()
+        try:
+            yield measurement
+        except Exception as e:
+            measurement.error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            measurement.duration = time.perf_counter() - start
+            if self.slow_threshold is not None and measurement.duration >= self.slow_threshold:
+                measurement.slow = True
+                logging.warning(
+                    f"Slow {operation} on {source} ({measurement.duration:.2f}s): {target}"
+                )
+            self._dispatch(measurement)
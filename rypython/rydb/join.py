@@ -0,0 +1,181 @@
+from dataclasses import dataclass
+from typing import Callable, List, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from rypython.rydb.tables import RyDBIndex, RyDBTable
+
+JOIN_TYPES = {
+    "inner": "INNER JOIN",
+    "left": "LEFT JOIN",
+    "right": "RIGHT JOIN",
+    "outer": "FULL OUTER JOIN"
+}
+
+ALIASES = {"left": "l", "right": "r"}
+
+
+@dataclass
+class JoinPlan:
+    """
+    A join of two RyDB tables on shared key columns, projected to a list of
+    ``(label, side, column)`` outputs where ``side`` is "left", "right" or
+    "key". Columns are requested by name, or as "table.column" where a name
+    exists on both sides.
+    """
+    left: str
+    right: str
+    on: List[str]
+    how: str
+    projection: List[Tuple[str, str, str]]
+
+    @classmethod
+    def build(
+            cls,
+            left: str,
+            left_columns: List[str],
+            right: str,
+            right_columns: List[str],
+            on: Union[str, List[str]],
+            columns: List[str] = None,
+            how: str = "inner"
+    ) -> "JoinPlan":
+        if how not in JOIN_TYPES:
+            raise ValueError(f"Cannot {how} join; expected one of {', '.join(JOIN_TYPES)}")
+        on = [on] if isinstance(on, str) else list(on)
+        for table_name, table_columns in ((left, left_columns), (right, right_columns)):
+            if missing := [key for key in on if key not in table_columns]:
+                raise KeyError(f"{table_name} has no join column(s) {missing}")
+        plan = cls(left, right, on, how, [])
+        if columns is None:
+            plan.projection = plan._default_projection(left_columns, right_columns)
+        else:
+            plan.projection = [
+                (column, *plan._resolve(column, left_columns, right_columns))
+                for column in columns
+            ]
+        return plan
+
+    def _default_projection(self, left_columns: List[str], right_columns: List[str]):
+        projection = [(key, "key", key) for key in self.on]
+        projection += [
+            (column, "left", column)
+            for column in left_columns
+            if column not in self.on
+        ]
+        projection += [
+            (f"{self.right}.{column}" if column in left_columns else column, "right", column)
+            for column in right_columns
+            if column not in self.on
+        ]
+        return projection
+
+    def _resolve(self, column: str, left_columns: List[str], right_columns: List[str]) -> Tuple[str, str]:
+        for side, table_name, table_columns in (
+                ("left", self.left, left_columns),
+                ("right", self.right, right_columns)
+        ):
+            if column.startswith(f"{table_name}.") and (name := column[len(table_name) + 1:]) in table_columns:
+                return side, name
+        if column in self.on:
+            return "key", column
+        in_left, in_right = column in left_columns, column in right_columns
+        if in_left and in_right:
+            raise ValueError(
+                f"{column} is in both {self.left} and {self.right}; "
+                f"request {self.left}.{column} or {self.right}.{column}"
+            )
+        if in_left:
+            return "left", column
+        if in_right:
+            return "right", column
+        raise KeyError(f"Neither {self.left} nor {self.right} has a column {column}")
+
+    def _expression(self, side: str, column: str, quote: Callable[[str], str]) -> str:
+        if side != "key":
+            return f"{ALIASES[side]}.{quote(column)}"
+        if self.how == "right":
+            return f"r.{quote(column)}"
+        if self.how == "outer":
+            return f"COALESCE(l.{quote(column)}, r.{quote(column)})"
+        return f"l.{quote(column)}"
+
+    def to_sql(self, quote: Callable[[str], str]) -> str:
+        select_clause = ", ".join(
+            f"{self._expression(side, column, quote)} AS {quote(label)}"
+            for label, side, column in self.projection
+        )
+        on_clause = " AND ".join(f"l.{quote(key)} = r.{quote(key)}" for key in self.on)
+        return (
+            f"SELECT {select_clause} "
+            f"FROM {quote(self.left)} l "
+            f"{JOIN_TYPES[self.how]} {quote(self.right)} r ON {on_clause}"
+        )
+
+    @staticmethod
+    def _probe(
+            probe: pd.DataFrame,
+            index: RyDBIndex,
+            keep_unmatched: bool
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        unmatched = np.array([-1] if keep_unmatched else [], dtype=np.intp)
+        matches = [
+            index.positions.get(key, unmatched)
+            for key in probe[index.columns].itertuples(index=False, name=None)
+        ]
+        counts = np.fromiter(map(len, matches), dtype=np.intp, count=len(matches))
+        probe_positions = np.repeat(np.arange(len(probe), dtype=np.intp), counts)
+        if not matches:
+            return probe_positions, np.array([], dtype=np.intp)
+        return probe_positions, np.concatenate(matches).astype(np.intp)
+
+    def _merge(self, left: pd.DataFrame, right: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray]:
+        merged = pd.merge(
+            left[self.on].assign(__left=np.arange(len(left))),
+            right[self.on].assign(__right=np.arange(len(right))),
+            on=self.on,
+            how=self.how
+        )
+        return (
+            merged["__left"].fillna(-1).to_numpy(dtype=np.intp),
+            merged["__right"].fillna(-1).to_numpy(dtype=np.intp)
+        )
+
+    def positions(self, left: RyDBTable, right: RyDBTable) -> Tuple[np.ndarray, np.ndarray]:
+        if self.how in ("inner", "left") and (index := right.get_index(self.on)) is not None:
+            return self._probe(left.df, index, keep_unmatched=self.how == "left")
+        if self.how in ("inner", "right") and (index := left.get_index(self.on)) is not None:
+            right_positions, left_positions = self._probe(right.df, index, keep_unmatched=self.how == "right")
+            return left_positions, right_positions
+        return self._merge(left.df, right.df)
+
+    @staticmethod
+    def _take(column: pd.Series, positions: np.ndarray) -> pd.Series:
+        column = column.reset_index(drop=True)
+        if len(positions) and positions.min() < 0:
+            return column.reindex(positions).reset_index(drop=True)
+        return column.take(positions).reset_index(drop=True)
+
+    def hash_join(self, left: RyDBTable, right: RyDBTable) -> pd.DataFrame:
+        left_positions, right_positions = self.positions(left, right)
+        sides = {
+            "left": (left.df, left_positions),
+            "right": (right.df, right_positions)
+        }
+        result = {}
+        for label, side, column in self.projection:
+            if side != "key":
+                df, positions = sides[side]
+                result[label] = self._take(df[column], positions)
+                continue
+            if self.how == "right":
+                result[label] = self._take(right.df[column], right_positions)
+            elif self.how == "outer":
+                result[label] = self._take(left.df[column], left_positions).where(
+                    left_positions >= 0,
+                    self._take(right.df[column], right_positions)
+                )
+            else:
+                result[label] = self._take(left.df[column], left_positions)
+        return pd.DataFrame(result, columns=[label for label, _, _ in self.projection])
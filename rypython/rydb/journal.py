@@ -0,0 +1,205 @@
+import datetime
+import decimal
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterator, Union
+
+import numpy as np
+import pandas as pd
+
+OPERATIONS = ("update_row", "update_rows", "append_rows", "delete_rows")
+
+
+def _encode(value: Any):
+    if value is pd.NaT or value is pd.NA:
+        return None
+    if isinstance(value, pd.DataFrame):
+        return {
+            "__frame__": {
+                "columns": value.columns.tolist(),
+                "records": value.astype(object).where(value.notna(), None).values.tolist()
+            }
+        }
+    if isinstance(value, pd.Timestamp):
+        return {"__timestamp__": value.isoformat()}
+    if isinstance(value, datetime.datetime):
+        return {"__datetime__": value.isoformat()}
+    if isinstance(value, datetime.date):
+        return {"__date__": value.isoformat()}
+    if isinstance(value, datetime.time):
+        return {"__time__": value.isoformat()}
+    if isinstance(value, decimal.Decimal):
+        return {"__decimal__": str(value)}
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"Cannot journal {type(value).__name__} values")
+
+
+def _decode(obj: dict):
+    if "__frame__" in obj:
+        return pd.DataFrame(obj["__frame__"]["records"], columns=obj["__frame__"]["columns"])
+    if "__timestamp__" in obj:
+        return pd.Timestamp(obj["__timestamp__"])
+    if "__datetime__" in obj:
+        return datetime.datetime.fromisoformat(obj["__datetime__"])
+    if "__date__" in obj:
+        return datetime.date.fromisoformat(obj["__date__"])
+    if "__time__" in obj:
+        return datetime.time.fromisoformat(obj["__time__"])
+    if "__decimal__" in obj:
+        return decimal.Decimal(obj["__decimal__"])
+    return obj
+
+
+class Journal:
+    """
+    An append-only file of numbered writes. ``mark_committed`` records the
+    last sequence number a source has committed, so entries at or below it
+    are never handed out again even if the file is not truncated afterwards.
+    """
+    def __init__(self, path: Union[str, Path], fsync: bool = True):
+        self.path = Path(path)
+        self.fsync = fsync
+        self._lock = threading.Lock()
+        self._file = open(self.path, "a", encoding="utf-8")
+        self.sequence = 0
+        self.committed = 0
+        for entry in self.entries():
+            if "committed" in entry:
+                self.committed = max(self.committed, entry["committed"])
+            else:
+                self.sequence = max(self.sequence, entry["seq"])
+        self.sequence = max(self.sequence, self.committed)
+        self._pending = sum(1 for _ in self.pending_entries())
+
+    def __len__(self):
+        return self._pending
+
+    def _write(self, entry: dict):
+        self._file.write(json.dumps(entry, default=_encode) + "\n")
+        self._file.flush()
+        if self.fsync:
+            os.fsync(self._file.fileno())
+
+    def append(self, op: str, table_name: str, **payload):
+        with self._lock:
+            self.sequence += 1
+            self._write({"seq": self.sequence, "op": op, "table": table_name, "payload": payload})
+            self._pending += 1
+
+    def mark_committed(self, sequence: int):
+        with self._lock:
+            self._write({"committed": sequence})
+            self.committed = sequence
+            self._pending = self.sequence - sequence
+
+    def pending_entries(self) -> Iterator[Dict[str, Any]]:
+        for entry in self.entries():
+            if entry.get("seq", 0) > self.committed:
+                yield entry
+
+    def entries(self) -> Iterator[Dict[str, Any]]:
+        with open(self.path, encoding="utf-8") as f:
+            for line_number, line in enumerate(f, start=1):
+                try:
+                    yield json.loads(line, object_hook=_decode)
+                except json.JSONDecodeError:
+                    logging.warning(f"Skipping torn entry at {self.path}:{line_number}")
+
+    def truncate(self):
+        with self._lock:
+            self._file.truncate(0)
+            self._file.flush()
+            if self.fsync:
+                os.fsync(self._file.fileno())
+            self._pending = 0
+
+    def close(self):
+        self._file.close()
+
+
+class WriteBehind:
+    """
+    Journals RyDB mutations to an append-only file and applies them to the
+    in-memory tables, then commits them to the source in batches once
+    ``max_pending`` writes have accumulated, every ``flush_interval``
+    seconds, or when ``flush()`` is called. Entries left in the journal by a
+    crash are replayed when the journal is reopened.
+
+    Each flush records a committed marker in the journal before truncating
+    it, and replay skips everything up to the last marker, so a crash after
+    the marker never re-applies a committed write. Delivery is at least
+    once: a crash after the source commits but before the marker is synced
+    replays that batch, and sources without natural keys (``append_rows``)
+    will duplicate those rows.
+    """
+    def __init__(
+            self,
+            source,
+            journal_path: Union[str, Path],
+            max_pending: int = 1_000,
+            flush_interval: float = None,
+            fsync: bool = True
+    ):
+        self.source = source
+        self.journal = Journal(journal_path, fsync=fsync)
+        self.max_pending = max_pending
+        self.flush_interval = flush_interval
+        self._lock = threading.RLock()
+        self._stopped = threading.Event()
+        self._thread = None
+        self.replay()
+        if flush_interval is not None:
+            self._thread = threading.Thread(target=self._flush_periodically, daemon=True)
+            self._thread.start()
+
+    @property
+    def pending(self):
+        return len(self.journal)
+
+    def apply(self, op: str, table_name: str, **payload):
+        if op not in OPERATIONS:
+            raise ValueError(f"Cannot journal {op}; expected one of {', '.join(OPERATIONS)}")
+        with self._lock:
+            result = self.source.stage(op, table_name, **payload)
+            self.journal.append(op, table_name, **payload)
+        if self.pending >= self.max_pending:
+            self.flush()
+        return result
+
+    def replay(self):
+        if not self.pending:
+            return
+        logging.warning(f"Replaying {self.pending} journaled writes from {self.journal.path}")
+        with self._lock:
+            for entry in self.journal.pending_entries():
+                self.source.stage(entry["op"], entry["table"], **entry["payload"])
+        self.flush()
+
+    def flush(self):
+        with self._lock:
+            if not self.pending:
+                return
+            pending, sequence = self.pending, self.journal.sequence
+            with self.source.measure("commit", rows_in=pending):
+                self.source.commit()
+            self.journal.mark_committed(sequence)
+            self.journal.truncate()
+        logging.info(f"Flushed {pending} journaled writes to {self.source.type}")
+
+    def _flush_periodically(self):
+        while not self._stopped.wait(self.flush_interval):
+            try:
+                self.flush()
+            except Exception as e:
+                logging.error(f"Write-behind flush failed; will retry: {e}")
+
+    def close(self):
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.flush()
+        self.journal.close()
@@ -0,0 +1,188 @@
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Tuple
+
+import pyodbc
+
+
+class ConnectionPool:
+    """
+    Thread-safe pool of ``pyodbc`` connections sharing one connection string.
+
+    Idle connections are handed out last-in-first-out and are checked with
+    ``SELECT 1`` before reuse once they have been idle for longer than
+    ``health_check_interval`` seconds. Nested ``connection()`` calls on the
+    same thread reuse the connection already checked out to that thread.
+
+    Parameters
+    ----------
+    conn_string: str
+    min_size: int
+    max_size: int
+    timeout: float
+    health_check_interval: float
+    **connect_options: dict
+    """
+    def __init__(
+            self,
+            conn_string: str,
+            min_size: int = 1,
+            max_size: int = 10,
+            timeout: float = 30.0,
+            health_check_interval: float = 60.0,
+            **connect_options
+    ):
+        if min_size > max_size:
+            raise ValueError(f"min_size ({min_size}) cannot exceed max_size ({max_size})!")
+        self.conn_string = conn_string
+        self.min_size = min_size
+        self.max_size = max_size
+        self.timeout = timeout
+        self.health_check_interval = health_check_interval
+        self.connect_options = connect_options
+        self._idle: List[Tuple[pyodbc.Connection, float]] = [
+            (self._connect(), time.monotonic())
+            for _ in range(min_size)
+        ]
+        self._checked_out: Dict[int, int] = {}
+        self._size = len(self._idle)
+        self._lock = threading.Condition()
+        self._local = threading.local()
+
+    @property
+    def size(self):
+        return self._size
+
+    @property
+    def idle(self):
+        return len(self._idle)
+
+    @property
+    def checked_out(self):
+        return len(self._checked_out)
+
+    def _connect(self):
+        return pyodbc.connect(self.conn_string, **self.connect_options)
+
+    @staticmethod
+    def _is_healthy(conn: pyodbc.Connection):
+        try:
+            curr = conn.cursor()
+            curr.execute("SELECT 1")
+            curr.fetchone()
+            curr.close()
+            return True
+        except pyodbc.Error:
+            return False
+
+    def _discard(self, conn: pyodbc.Connection):
+        try:
+            conn.close()
+        except pyodbc.Error:
+            pass
+        with self._lock:
+            self._size -= 1
+            self._lock.notify()
+
+    def _check_out(self, conn: pyodbc.Connection):
+        with self._lock:
+            self._checked_out[id(conn)] = threading.get_ident()
+        return conn
+
+    def acquire(self):
+        deadline = time.monotonic() + self.timeout
+        while True:
+            with self._lock:
+                while not self._idle and self._size >= self.max_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise TimeoutError(
+                            f"No connection available after {self.timeout}s "
+                            f"({self._size} of {self.max_size} checked out)!"
+                        )
+                    self._lock.wait(remaining)
+                if self._idle:
+                    conn, last_used = self._idle.pop()
+                else:
+                    conn, last_used = None, None
+                    self._size += 1
+            if conn is None:
+                try:
+                    return self._check_out(self._connect())
+                except pyodbc.Error:
+                    with self._lock:
+                        self._size -= 1
+                        self._lock.notify()
+                    raise
+            if time.monotonic() - last_used < self.health_check_interval or self._is_healthy(conn):
+                return self._check_out(conn)
+            logging.warning("Discarding stale pooled connection")
+            self._discard(conn)
+
+    def release(self, conn: pyodbc.Connection):
+        with self._lock:
+            self._checked_out.pop(id(conn), None)
+        try:
+            conn.rollback()
+        except pyodbc.Error:
+            self._discard(conn)
+            return
+        with self._lock:
+            self._idle.append((conn, time.monotonic()))
+            self._lock.notify()
+
+    @contextmanager
+    def connection(self):
+        held = getattr(self._local, "conn", None)
+        if held is not None:
+            yield held
+            return
+        conn = self.acquire()
+        self._local.conn = conn
+        try:
+            yield conn
+        finally:
+            self._local.conn = None
+            self.release(conn)
+
+    @contextmanager
+    def cursor(self):
+        with self.connection() as conn:
+            curr = conn.cursor()
+            try:
+                yield curr
+            finally:
+                curr.close()
+
+    def close(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn, _ in idle:
+            self._discard(conn)
+
+
+_POOLS: Dict[Tuple[str, tuple], ConnectionPool] = {}
+_POOLS_LOCK = threading.Lock()
+
+
+def get_pool(conn_string: str, **pool_options) -> ConnectionPool:
+    """
+    Returns the shared pool for ``conn_string`` and ``pool_options``. Pools
+    are keyed on both, so callers asking for different sizes or connect
+    options get a pool of their own rather than someone else's settings.
+    """
+    key = (conn_string, tuple(sorted(pool_options.items())))
+    with _POOLS_LOCK:
+        if (pool := _POOLS.get(key)) is None:
+            pool = _POOLS[key] = ConnectionPool(conn_string, **pool_options)
+        return pool
+
+
+def close_all():
+    with _POOLS_LOCK:
+        pools = list(_POOLS.values())
+        _POOLS.clear()
+    for pool in pools:
+        pool.close()
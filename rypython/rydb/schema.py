@@ -0,0 +1,292 @@
+from dataclasses import dataclass, field
+from typing import List, Any, Dict
+
+import pandas as pd
+
+from rypython.ryagram import erDiagram
+
+DEFAULT_SAMPLE_SIZE = 100_000
+
+MAPPINGS = {
+    "mssql": {
+        "bool": "BIT",
+        "int": [
+            ("TINYINT", 0, 255),
+            ("SMALLINT", -2 ** 15, 2 ** 15 - 1),
+            ("INT", -2 ** 31, 2 ** 31 - 1),
+            ("BIGINT", -2 ** 63, 2 ** 63 - 1)
+        ],
+        "float32": "REAL",
+        "float64": "FLOAT",
+        "datetime": "DATETIME2",
+        "char": "NCHAR({length})",
+        "max_char": 4000,
+        "varchar": "NVARCHAR({length})",
+        "max_varchar": 4000,
+        "text": [("NVARCHAR(MAX)", None)],
+        "quote": "[{}]"
+    },
+    "mysql": {
+        "bool": "BOOLEAN",
+        "int": [
+            ("TINYINT", -2 ** 7, 2 ** 7 - 1),
+            ("SMALLINT", -2 ** 15, 2 ** 15 - 1),
+            ("INT", -2 ** 31, 2 ** 31 - 1),
+            ("BIGINT", -2 ** 63, 2 ** 63 - 1)
+        ],
+        "float32": "FLOAT",
+        "float64": "DOUBLE",
+        "datetime": "DATETIME",
+        "char": "CHAR({length})",
+        "max_char": 255,
+        "varchar": "VARCHAR({length})",
+        "max_varchar": 16383,
+        "text": [
+            ("TEXT", 2 ** 16),
+            ("MEDIUMTEXT", 2 ** 24),
+            ("LONGTEXT", None)
+        ],
+        "quote": "`{}`"
+    },
+    "sqlite": {
+        "bool": "INTEGER",
+        "int": [("INTEGER", -2 ** 63, 2 ** 63 - 1)],
+        "float32": "REAL",
+        "float64": "REAL",
+        "datetime": "TIMESTAMP",
+        "char": "TEXT",
+        "max_char": None,
+        "varchar": "TEXT",
+        "max_varchar": None,
+        "text": [("TEXT", None)],
+        "quote": '"{}"'
+    }
+}
+
+
+def column_kind(column: pd.Series) -> str:
+    dtype = column.dtype
+    if pd.api.types.is_bool_dtype(dtype):
+        return "bool"
+    if pd.api.types.is_integer_dtype(dtype):
+        return "int"
+    if pd.api.types.is_float_dtype(dtype):
+        return "float"
+    if pd.api.types.is_datetime64_any_dtype(dtype):
+        return "datetime"
+    return "string"
+
+
+@dataclass
+class ColumnStats:
+    name: str
+    kind: str
+    dtype: str
+    count: int
+    null_count: int
+    distinct: int = None
+    min: Any = None
+    max: Any = None
+    min_length: int = None
+    max_length: int = None
+    sampled: bool = False
+
+    @property
+    def nullable(self):
+        return self.null_count > 0 or self.count == 0
+
+    @classmethod
+    def from_series(cls, column: pd.Series, sample_size: int = DEFAULT_SAMPLE_SIZE):
+        return TableSchema.from_frame(
+            "",
+            column.to_frame(name=column.name),
+            sample_size=sample_size
+        ).columns[0]
+
+    def _int_type(self, mapping: dict) -> str:
+        if self.min is None:
+            return mapping["int"][-1][0]
+        for sql_type, min_value, max_value in mapping["int"]:
+            if min_value <= self.min and self.max <= max_value:
+                return sql_type
+        return mapping["int"][-1][0]
+
+    def _string_type(self, mapping: dict) -> str:
+        length = self.max_length or 1
+        if (max_varchar := mapping["max_varchar"]) is None or length > max_varchar:
+            for sql_type, limit in mapping["text"]:
+                if limit is None or length < limit:
+                    return sql_type
+        if self.min_length == self.max_length and length <= (mapping["max_char"] or 0):
+            return mapping["char"].format(length=length)
+        return mapping["varchar"].format(length=length)
+
+    def sql_type(self, dialect: str = "mssql") -> str:
+        mapping = MAPPINGS[dialect]
+        if self.kind == "bool":
+            return mapping["bool"]
+        if self.kind == "int":
+            return self._int_type(mapping)
+        if self.kind == "float":
+            return mapping["float32" if self.dtype == "float32" else "float64"]
+        if self.kind == "datetime":
+            return mapping["datetime"]
+        return self._string_type(mapping)
+
+
+class TableSchema:
+    def __init__(
+            self,
+            name: str,
+            columns: List[ColumnStats],
+            primary_key: List[str] = None
+    ):
+        self.name = name
+        self.columns = columns
+        self.primary_key = primary_key or []
+
+    def __getitem__(self, column_name: str) -> ColumnStats:
+        for column in self.columns:
+            if column.name == column_name:
+                return column
+        raise KeyError(column_name)
+
+    @classmethod
+    def from_frame(
+            cls,
+            name: str,
+            df: pd.DataFrame,
+            primary_key: List[str] = None,
+            sample_size: int = DEFAULT_SAMPLE_SIZE,
+            distinct: bool = True
+    ):
+        sampled = sample_size is not None and len(df) > sample_size
+        sample = df.sample(n=sample_size, random_state=0) if sampled else df
+        null_counts = df.isna().sum()
+        distinct_counts = sample.nunique(dropna=True) if distinct else {}
+        kinds = {column_name: column_kind(df[column_name]) for column_name in df.columns}
+        ordered = [
+            column_name for column_name, kind in kinds.items()
+            if kind in ("int", "float", "datetime")
+        ]
+        minimums = df[ordered].min() if ordered else {}
+        maximums = df[ordered].max() if ordered else {}
+        columns = []
+        for column_name, kind in kinds.items():
+            stats = ColumnStats(
+                name=column_name,
+                kind=kind,
+                dtype=df[column_name].dtype.name,
+                count=len(df),
+                null_count=int(null_counts[column_name]),
+                distinct=int(distinct_counts[column_name]) if distinct else None,
+                sampled=sampled
+            )
+            if column_name in ordered and stats.null_count < stats.count:
+                stats.min = minimums[column_name]
+                stats.max = maximums[column_name]
+            if kind == "string" and stats.null_count < stats.count:
+                lengths = df[column_name].dropna().astype(str).str.len()
+                stats.min_length = int(lengths.min())
+                stats.max_length = int(lengths.max())
+            columns.append(stats)
+        return cls(name, columns, primary_key=primary_key)
+
+    def sql_types(self, dialect: str = "mssql") -> Dict[str, str]:
+        return {
+            column.name: column.sql_type(dialect)
+            for column in self.columns
+        }
+
+    def to_ddl(self, dialect: str = "mssql", table_name: str = None) -> str:
+        template = MAPPINGS[dialect]["quote"]
+        closing = template[-1]
+
+        def quote(name: str) -> str:
+            return template.format(name.replace(closing, closing * 2))
+
+        lines = [
+            f"{quote(column.name)} {column.sql_type(dialect)}"
+            f"{'' if column.nullable else ' NOT NULL'}"
+            for column in self.columns
+        ]
+        if self.primary_key:
+            lines.append(f"PRIMARY KEY ({', '.join(quote(key) for key in self.primary_key)})")
+        columns = ",\n    ".join(lines)
+        return f"CREATE TABLE {quote(table_name or self.name)} (\n    {columns}\n)"
+
+
+@dataclass
+class ForeignKey:
+    table_name: str
+    columns: List[str]
+    referenced_table: str
+    referenced_columns: List[str]
+    name: str = None
+
+
+@dataclass
+class Catalog:
+    columns: Dict[str, Dict[str, str]]
+    primary_keys: Dict[str, List[str]] = field(default_factory=dict)
+    foreign_keys: List[ForeignKey] = field(default_factory=list)
+
+    @classmethod
+    def from_frames(
+            cls,
+            columns: pd.DataFrame,
+            primary_keys: Dict[str, List[str]],
+            foreign_keys: pd.DataFrame = None
+    ) -> "Catalog":
+        """
+        Builds a catalog from one row per column (table_name, column_name,
+        data_type) and one row per foreign key column (constraint_name,
+        table_name, column_name, referenced_table, referenced_column).
+        """
+        catalog = cls(
+            columns={
+                table_name: dict(zip(table_columns.column_name, table_columns.data_type))
+                for table_name, table_columns in columns.groupby("table_name", sort=False)
+            },
+            primary_keys=primary_keys
+        )
+        if foreign_keys is None or foreign_keys.empty:
+            return catalog
+        for (table_name, name), key_columns in foreign_keys.groupby(
+                ["table_name", "constraint_name"],
+                sort=False
+        ):
+            referenced_table = key_columns.referenced_table.iloc[0]
+            referenced_columns = key_columns.referenced_column.tolist()
+            if any(pd.isna(column) for column in referenced_columns):
+                referenced_columns = primary_keys.get(referenced_table, referenced_columns)
+            catalog.foreign_keys.append(
+                ForeignKey(
+                    table_name=table_name,
+                    columns=key_columns.column_name.tolist(),
+                    referenced_table=referenced_table,
+                    referenced_columns=referenced_columns,
+                    name=str(name)
+                )
+            )
+        return catalog
+
+    def to_mermaid(self) -> erDiagram:
+        diagram = erDiagram()
+        foreign_key_columns = {}
+        for foreign_key in self.foreign_keys:
+            foreign_key_columns.setdefault(foreign_key.table_name, []).extend(foreign_key.columns)
+        for table_name, dtypes in self.columns.items():
+            diagram.add_entity(
+                table_name,
+                dtypes,
+                primary_key=self.primary_keys.get(table_name),
+                foreign_keys=foreign_key_columns.get(table_name)
+            )
+        for foreign_key in self.foreign_keys:
+            diagram.add_relationship(
+                foreign_key.referenced_table,
+                foreign_key.table_name,
+                label=", ".join(foreign_key.columns)
+            )
+        return diagram
@@ -0,0 +1,122 @@
+import json
+import logging
+import os
+import shutil
+import time
+import uuid
+from pathlib import Path
+from typing import Dict, Tuple, Union
+
+import pandas as pd
+
+from rypython.rydb.tables import RyDBTable
+
+MANIFEST_FILENAME = "CURRENT.json"
+METADATA_KEY = b"rydb"
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.ipc
+    except ImportError as e:
+        raise ImportError("RyDB snapshots require pyarrow (pip install pyarrow)") from e
+    return pyarrow
+
+
+def _to_arrow(table: RyDBTable):
+    pa = _pyarrow()
+    df = table.df
+    try:
+        arrow_table = pa.Table.from_pandas(df, preserve_index=True)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        df = df.copy()
+        for column_name in df.columns[df.dtypes == object]:
+            try:
+                pa.array(df[column_name], from_pandas=True)
+            except (pa.ArrowInvalid, pa.ArrowTypeError):
+                logging.warning(f"Storing mixed column {table.name}.{column_name} as strings in snapshot")
+                df[column_name] = df[column_name].map(str, na_action="ignore")
+        arrow_table = pa.Table.from_pandas(df, preserve_index=True)
+    metadata = {
+        **(arrow_table.schema.metadata or {}),
+        METADATA_KEY: json.dumps(
+            {
+                "name": table.name,
+                "primary_key": table.primary_key
+            }
+        ).encode()
+    }
+    return arrow_table.replace_schema_metadata(metadata)
+
+
+def _to_frame(arrow_table) -> pd.DataFrame:
+    return arrow_table.to_pandas(split_blocks=True)
+
+
+def read_manifest(path: Union[str, Path]) -> dict:
+    with open(Path(path) / MANIFEST_FILENAME) as f:
+        return json.load(f)
+
+
+def write_snapshot(
+        path: Union[str, Path],
+        tables: Dict[str, RyDBTable],
+        keep: int = 2
+) -> str:
+    pa = _pyarrow()
+    path = Path(path)
+    version = f"{time.strftime('%Y%m%dT%H%M%S')}-{uuid.uuid4().hex[:8]}"
+    version_dir = path / version
+    version_dir.mkdir(parents=True)
+    files = {}
+    for i, (table_name, table) in enumerate(tables.items()):
+        files[table_name] = f"{i:04d}.arrow"
+        arrow_table = _to_arrow(table)
+        with pa.OSFile(str(version_dir / files[table_name]), "wb") as sink:
+            with pa.ipc.new_file(sink, arrow_table.schema) as writer:
+                writer.write_table(arrow_table)
+    manifest = {
+        "version": version,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "tables": files
+    }
+    staged_manifest = path / f".{MANIFEST_FILENAME}.{version}"
+    with open(staged_manifest, "w") as f:
+        json.dump(manifest, f)
+    os.replace(staged_manifest, path / MANIFEST_FILENAME)
+    logging.info(f"Wrote snapshot {version} of {len(files)} tables to {path}")
+    _prune(path, version, keep=keep)
+    return version
+
+
+def _prune(path: Path, current: str, keep: int):
+    versions = sorted(
+        (
+            child for child in path.iterdir()
+            if child.is_dir() and child.name != current
+        ),
+        key=lambda child: child.stat().st_mtime_ns
+    )
+    for stale in versions[:len(versions) - max(keep - 1, 0)]:
+        try:
+            shutil.rmtree(stale)
+        except OSError as e:
+            logging.debug(f"Could not remove stale snapshot {stale}: {e}")
+
+
+def read_snapshot(path: Union[str, Path]) -> Tuple[str, Dict[str, RyDBTable]]:
+    pa = _pyarrow()
+    path = Path(path)
+    manifest = read_manifest(path)
+    tables = {}
+    for table_name, filename in manifest["tables"].items():
+        source = pa.memory_map(str(path / manifest["version"] / filename), "r")
+        arrow_table = pa.ipc.open_file(source).read_all()
+        metadata = json.loads(arrow_table.schema.metadata[METADATA_KEY])
+        tables[table_name] = RyDBTable(
+            table_name,
+            _to_frame(arrow_table),
+            primary_key=metadata.get("primary_key")
+        )
+    return manifest["version"], tables
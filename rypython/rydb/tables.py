@@ -1,7 +1,12 @@
 import json
 import logging
+import re
+from collections import OrderedDict
+from contextlib import contextmanager
 from dataclasses import dataclass
-from typing import List, Union, Dict, Any
+from itertools import islice
+from operator import attrgetter
+from typing import List, Union, Dict, Any, Tuple, Optional, Callable, Iterable, Iterator
 
 import numpy as np
 import pandas as pd
@@ -10,6 +15,13 @@ from rich.table import Table
 
 from rypython.rex import capture_all
 from rypython.ryagram import erDiagram
+from rypython.rydb.schema import (
+    DEFAULT_SAMPLE_SIZE,
+    MAPPINGS,
+    ColumnStats,
+    TableSchema,
+    column_kind
+)
 
 logging.basicConfig(level=logging.DEBUG)
 
@@ -20,92 +32,99 @@ class DType:
     sql: str = None
 
 
+@dataclass
+class UpdateSummary:
+    matched: int
+    changed: int
+    unmatched: int
+    diff: pd.DataFrame
+
+
+@dataclass
+class MemoryReport:
+    table_name: str
+    before: int
+    after: int
+
+    @property
+    def saved(self):
+        return self.before - self.after
+
+    def __str__(self):
+        return (
+            f"{self.table_name}: {self.before / 2 ** 20:.1f}MB -> "
+            f"{self.after / 2 ** 20:.1f}MB ({self.saved / max(self.before, 1):.0%} saved)"
+        )
+
+
 class DataType:
-    MAPPING = {
-        "string": {
-            "tiny": "TINYTEXT",
-            "text": "TEXT",
-            "med": "MEDIUMTEXT",
-            "long": "LONGTEXT"
-        },
-        "int": {
-            "int8": "TINYINT",
-            "int16": "SMALLINT",
-            "int32": "INT",
-            "int64": "BIGINT"
-        },
-        "float": "FLOAT",
-        "date": "DATE",
-        "time": "TIME",
-        "datetime": "DATETIME"
-    }
-
-    def __init__(self, column: pd.Series):
-        self.pandas = column.dtype
-        self.sql = self.to_sql_dtype(column)
+    MAPPINGS = MAPPINGS
 
-    @staticmethod
-    def category_to_sql_dtype(column: pd.Series):
-        categories = column.astype("category").dtype.categories.to_list()
-        return f"ENUM({', '.join(category for category in categories)})"
+    def __init__(self, column: pd.Series, dialect: str = "mssql"):
+        self.pandas = column.dtype
+        self.stats = ColumnStats.from_series(column)
+        self.sql = self.stats.sql_type(dialect)
 
     @staticmethod
-    def str_to_sql_char(char_lens: np.ndarray):
-        if char_lens.shape[0] == 1:
-            return f"CHAR({char_lens[0]})"
+    def kind(column: pd.Series) -> str:
+        return column_kind(column)
 
     @staticmethod
-    def str_to_sql_dtype(column: pd.Series):
-        string_mapping = DataType.MAPPING.get("string")
-        max_len = column.map(len).max()
-
-        if (
-                (char_lens := column.map(len).unique())
-        ):
-            if sql_dtype := DataType.str_to_sql_char(char_lens):
-                return sql_dtype
-
-        if max_len < pow(2, 8):
-            return string_mapping.get("tiny")
-        if max_len < pow(2, 16):
-            return string_mapping.get("text")
-        if max_len < pow(2, 24):
-            return string_mapping.get("med")
-        return string_mapping.get("long")
+    def smallest_int_dtype(column: pd.Series, nullable: bool = False):
+        min_value, max_value = column.min(), column.max()
+        for dtype in (np.int8, np.int16, np.int32, np.int64):
+            info = np.iinfo(dtype)
+            if info.min <= min_value and max_value <= info.max:
+                name = np.dtype(dtype).name
+                return name.capitalize() if nullable else name
 
     @staticmethod
-    def int_to_sql_dtype(column: pd.Series):
-        int_mapping = DataType.MAPPING.get("int")
-        dtype = column.dtype.lower()
-
-        if sql_dtype := int_mapping.get(dtype):
-            return sql_dtype
-
-        max_value = column.max()
-        if max_value < pow(2, 16):
-            return int_mapping.get("int16")
-        if max_value < pow(2, 32):
-            return int_mapping.get("int32")
-        return int_mapping.get("int64")
+    def compact_dtype(
+            column: pd.Series,
+            category_threshold: float = 0.5,
+            string_storage: str = "python",
+            float_to_int: bool = False
+    ):
+        """
+        The smallest dtype that holds the column's values losslessly. Floats
+        only narrow to float32; whole-number floats become nullable integers
+        only with ``float_to_int``, since that changes what the column accepts.
+        """
+        if column.empty or isinstance(column.dtype, pd.CategoricalDtype):
+            return None
+        kind = DataType.kind(column)
+        non_null = column.dropna()
+        if kind == "int":
+            if non_null.empty:
+                return None
+            nullable = isinstance(column.dtype, pd.api.extensions.ExtensionDtype)
+            return DataType.smallest_int_dtype(non_null, nullable=nullable)
+        if kind == "float":
+            if non_null.empty:
+                return None
+            values = non_null.to_numpy(dtype=np.float64)
+            if float_to_int and np.array_equal(values, np.trunc(values)) and np.abs(values).max() < 2 ** 53:
+                return DataType.smallest_int_dtype(non_null, nullable=True)
+            if np.array_equal(values.astype(np.float32).astype(np.float64), values):
+                return "float32"
+            return None
+        if kind != "string":
+            return None
+        inferred = pd.api.types.infer_dtype(column, skipna=True)
+        if inferred == "boolean":
+            return "boolean"
+        if inferred != "string":
+            return None
+        if non_null.nunique() <= category_threshold * len(column):
+            return "category"
+        return pd.StringDtype(string_storage)
 
     @staticmethod
     def to_sql_dtype(
-            column: pd.Series = Any
+            column: pd.Series,
+            dialect: str = "mssql"
     ):
-        dtype = column.dtype.lower()
-        sql_mapping = DataType.MAPPING.get(dtype)
-        if isinstance(sql_mapping, str):
-            return sql_mapping
-        if dtype == "category":
-            return DataType.category_to_sql_dtype(column)
-        if "int" in dtype:
-            if (
-                    (len_counts := column.astype("string").map(len).unique().shape[0]) == 1
-            ):
-                return DataType.to_sql_type(column.astype("string"))
-            return DataType.int_to_sql_dtype(column)
-        if dtype == "string":
-            return DataType.int_to_sql_dtype(column)
+        return ColumnStats.from_series(column).sql_type(dialect)
 
 
 class RyDBColumn:
@@ -131,66 +150,464 @@ class CalculatedColumn(RyDBColumn):
         pass
 
 
+class RyDBIndex:
+    """
+    Row positions by key. Unique indexes leave out keys containing nulls, as
+    SQL UNIQUE constraints do, so rows still waiting on a server-assigned key
+    can be appended.
+    """
+    def __init__(self, columns: List[str], unique: bool = False):
+        self.columns = columns
+        self.unique = unique
+        self.positions: Dict[tuple, np.ndarray] = {}
+
+    def __len__(self):
+        return len(self.positions)
+
+    @staticmethod
+    def _as_key(key: Any) -> tuple:
+        return key if isinstance(key, tuple) else (key,)
+
+    def key_for(self, values: dict) -> tuple:
+        return tuple(values[column] for column in self.columns)
+
+    def _indexed(self, key: tuple) -> bool:
+        return not self.unique or not any(pd.isna(value) for value in key)
+
+    def _group(self, df: pd.DataFrame, offset: int = 0) -> Dict[tuple, np.ndarray]:
+        if df.empty:
+            return {}
+        groups = df.groupby(self.columns, sort=False, dropna=self.unique).indices
+        return {
+            self._as_key(key): positions + offset
+            for key, positions in groups.items()
+        }
+
+    def _check_unique(self, key: tuple):
+        if self.unique and len(self.positions[key]) > 1:
+            raise ValueError(f"Duplicate key {key} for unique index on {self.columns}!")
+
+    def build(self, df: pd.DataFrame):
+        self.positions = self._group(df)
+        if self.unique and any(len(positions) > 1 for positions in self.positions.values()):
+            raise ValueError(f"Duplicate keys for unique index on {self.columns}!")
+
+    def check_extend(self, rows: pd.DataFrame):
+        if not self.unique:
+            return
+        for key, positions in self._group(rows.reindex(columns=self.columns)).items():
+            if len(positions) > 1 or key in self.positions:
+                raise ValueError(f"Duplicate key {key} for unique index on {self.columns}!")
+
+    def extend(self, rows: pd.DataFrame, offset: int):
+        for key, positions in self._group(rows, offset=offset).items():
+            if (existing := self.positions.get(key)) is not None:
+                positions = np.concatenate([existing, positions])
+            self.positions[key] = positions
+            self._check_unique(key)
+
+    def move(self, position: int, old_key: tuple, new_key: tuple):
+        if old_key == new_key:
+            return
+        if (remaining := self.positions.get(old_key)) is not None:
+            remaining = remaining[remaining != position]
+            if len(remaining):
+                self.positions[old_key] = remaining
+            else:
+                del self.positions[old_key]
+        if not self._indexed(new_key):
+            return
+        existing = self.positions.get(new_key)
+        self.positions[new_key] = np.array([position]) if existing is None else np.sort(np.append(existing, position))
+        self._check_unique(new_key)
+
+    def check_moves(self, positions: np.ndarray, new_keys: List[tuple]):
+        if not self.unique:
+            return
+        moving = set(positions.tolist())
+        seen = set()
+        for new_key in new_keys:
+            if not self._indexed(new_key):
+                continue
+            existing = self.positions.get(new_key, ())
+            if new_key in seen or any(position not in moving for position in existing):
+                raise ValueError(f"Duplicate key {new_key} for unique index on {self.columns}!")
+            seen.add(new_key)
+
+    def get(self, key: Any) -> np.ndarray:
+        return self.positions.get(self._as_key(key), np.array([], dtype=np.intp))
+
+    def copy(self) -> "RyDBIndex":
+        index = RyDBIndex(self.columns, unique=self.unique)
+        index.positions = dict(self.positions)
+        return index
+
+
+class RowChanges:
+    def __init__(self):
+        self.inserted = set()
+        self.updated: Dict[Any, set] = {}
+        self.deleted: Dict[Any, tuple] = {}
+        self.original_keys: Dict[Any, tuple] = {}
+        self._suspended = 0
+
+    @property
+    def tracking(self):
+        return not self._suspended
+
+    @property
+    def is_dirty(self):
+        return bool(self.inserted or self.updated or self.deleted)
+
+    @contextmanager
+    def suspended(self, suspend: bool = True):
+        if not suspend:
+            yield self
+            return
+        self._suspended += 1
+        try:
+            yield self
+        finally:
+            self._suspended -= 1
+
+    def mark_inserted(self, labels: pd.Index):
+        if self.tracking:
+            self.inserted.update(labels)
+
+    def mark_updated(
+            self,
+            labels: pd.Index,
+            columns: List[str],
+            original_keys: List[tuple] = None
+    ):
+        if not self.tracking:
+            return
+        for i, label in enumerate(labels):
+            if label in self.inserted:
+                continue
+            self.updated.setdefault(label, set()).update(columns)
+            if original_keys is not None:
+                self.original_keys.setdefault(label, original_keys[i])
+
+    def mark_deleted(self, labels: pd.Index, keys: List[tuple]):
+        if not self.tracking:
+            return
+        for label, key in zip(labels, keys):
+            self.updated.pop(label, None)
+            if label in self.inserted:
+                self.inserted.discard(label)
+                continue
+            self.deleted[label] = self.original_keys.pop(label, key)
+
+    def clear(self):
+        self.inserted.clear()
+        self.updated.clear()
+        self.deleted.clear()
+        self.original_keys.clear()
+
+    def copy(self) -> "RowChanges":
+        changes = RowChanges()
+        changes.inserted = set(self.inserted)
+        changes.updated = {label: set(columns) for label, columns in self.updated.items()}
+        changes.deleted = dict(self.deleted)
+        changes.original_keys = dict(self.original_keys)
+        return changes
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    entries: int = 0
+    max_entries: int = 0
+
+    @property
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class QueryCache:
+    def __init__(self, max_entries: int = 128, max_rows: int = None):
+        if max_entries < 1:
+            raise ValueError(f"max_entries must be at least 1, got {max_entries}!")
+        self.max_entries = max_entries
+        self.max_rows = max_rows
+        self._entries: OrderedDict = OrderedDict()
+        self._stats = CacheStats(max_entries=max_entries)
+
+    @property
+    def stats(self) -> CacheStats:
+        return CacheStats(
+            hits=self._stats.hits,
+            misses=self._stats.misses,
+            evictions=self._stats.evictions,
+            entries=len(self._entries),
+            max_entries=self.max_entries
+        )
+
+    @staticmethod
+    def key_for(query: Any, *args) -> Optional[tuple]:
+        if isinstance(query, str):
+            query_key = query
+        elif isinstance(query, dict):
+            query_key = tuple(sorted(query.items(), key=lambda item: item[0]))
+        else:
+            return None
+        key = (query_key, *args)
+        try:
+            hash(key)
+        except TypeError:
+            return None
+        return key
+
+    def get(self, key: tuple):
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            self._stats.hits += 1
+            return self._entries[key]
+        self._stats.misses += 1
+        return None
+
+    def put(self, key: tuple, result: Any):
+        if self.max_rows is not None and len(getattr(result, "index", ())) > self.max_rows:
+            return
+        self._entries[key] = result
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._stats.evictions += 1
+
+    def clear(self):
+        self._entries.clear()
+
+
+@dataclass
+class TableSnapshot:
+    df: pd.DataFrame
+    indexes: Dict[Tuple[str, ...], RyDBIndex]
+    changes: RowChanges
+    next_label: int
+    sync_point: Optional[Tuple[str, Any]] = None
+
+
+class Transaction:
+    def __init__(self, tables: Dict[str, "RyDBTable"], updated: set = None):
+        self.tables = dict(tables)
+        self.updated = updated
+        self._updated = set(updated) if updated is not None else None
+        self.snapshots = {
+            table_name: table.snapshot()
+            for table_name, table in self.tables.items()
+        }
+
+    @property
+    def active(self):
+        return bool(self.snapshots)
+
+    def rollback(self):
+        for table_name, snapshot in self.snapshots.items():
+            self.tables[table_name].rollback(snapshot)
+        self.snapshots.clear()
+        if self.updated is not None:
+            self.updated.clear()
+            self.updated.update(self._updated)
+
+    def release(self):
+        for table_name, snapshot in self.snapshots.items():
+            self.tables[table_name].release(snapshot)
+        self.snapshots.clear()
+
+
 class RyDBTable:
-    def __init__(self, table_name: str, table: pd.DataFrame):
+    def __init__(
+            self,
+            table_name: str,
+            table: pd.DataFrame,
+            primary_key: List[str] = None
+    ):
         self.name = table_name
         self.df = table
-        self._refresh()
+        self.primary_key = primary_key
+        self.indexes: Dict[Tuple[str, ...], RyDBIndex] = {}
+        self.changes = RowChanges()
+        self.cache: Optional[QueryCache] = None
+        self.version = 0
+        self.sync_point: Optional[Tuple[str, Any]] = None
+        self._next_label = len(table)
+        self._snapshots = 0
+
+    @property
+    def df(self) -> pd.DataFrame:
+        return self._df
+
+    @df.setter
+    def df(self, df: pd.DataFrame):
+        self._df = df
+        self._shared = set()
 
-    def to_mermaid(self):
+    def __getattr__(self, column_name: str):
+        df = self.__dict__.get("_df")
+        if df is not None and column_name in df.columns:
+            return df[column_name]
+        raise AttributeError(f"{type(self).__name__} has no attribute or column {column_name!r}")
+
+    def __dir__(self):
+        return [
+            *super().__dir__(),
+            *(column for column in self.columns if isinstance(column, str) and column.isidentifier())
+        ]
+
+    def snapshot(self) -> TableSnapshot:
+        """
+        Captures the table so it can be rolled back. Column data is shared
+        with the snapshot until a column is first written, at which point
+        only that column is copied.
+        """
+        snapshot = TableSnapshot(
+            df=self.df,
+            indexes={columns: index.copy() for columns, index in self.indexes.items()},
+            changes=self.changes.copy(),
+            next_label=self._next_label,
+            sync_point=self.sync_point
+        )
+        self.df = self.df.copy(deep=False)
+        self._shared = set(self.df.columns)
+        self._snapshots += 1
+        return snapshot
+
+    def rollback(self, snapshot: TableSnapshot):
+        self.df = snapshot.df.copy(deep=False)
+        self._shared = set(self.df.columns)
+        self.indexes = {columns: index.copy() for columns, index in snapshot.indexes.items()}
+        self.changes = snapshot.changes.copy()
+        self._next_label = snapshot.next_label
+        self.sync_point = snapshot.sync_point
+        self._touch()
+        self.release(snapshot)
+        logging.info(f"Rolled back {self.name}")
+
+    def release(self, snapshot: TableSnapshot):
+        self._snapshots = max(self._snapshots - 1, 0)
+        if not self._snapshots:
+            self._shared.clear()
+
+    def _replace(self, column_name: str, values: Any):
+        """
+        Swaps in a new block for the column instead of assigning over it;
+        older pandas writes ``df[column] = ...`` into the existing block,
+        which a snapshot may still share.
+        """
+        loc = self.df.columns.get_loc(column_name)
+        del self.df[column_name]
+        self.df.insert(loc, column_name, values)
+        self._shared.discard(column_name)
+
+    def _own(self, columns: List[str]):
+        for column_name in self._shared.intersection(columns):
+            self._replace(column_name, self.df[column_name].copy())
+
+    def to_mermaid(self) -> erDiagram:
         diagram = erDiagram()
         diagram.add_entity_by_dtypes(
             self.name,
-            self.df.dtypes
+            self.df.dtypes,
+            primary_key=self.primary_key
         )
+        return diagram
 
     @staticmethod
     def _extract_attribute_from_base_model(base_model: BaseModel, attr_name: str):
+        return RyDBTable._compile_accessor(attr_name)(base_model)
+
+    @staticmethod
+    def _compile_accessor(attr_name: str) -> Callable[[BaseModel], Any]:
         if not attr_name.startswith("$"):
-            return getattr(base_model, attr_name)
-        attr_path = attr_name.replace("$", "").split(".")
-        attr_value = base_model
-        for attr_level in attr_path:
-            attr_value = getattr(attr_value, attr_level)
-        return attr_value
+            return lambda base_model: getattr(base_model, attr_name)
+        return attrgetter(attr_name.replace("$", ""))
 
     @staticmethod
     def _transform_value(value: Any, transform_type: str):
         pass
 
+    @classmethod
+    def _compile_accessors(
+            cls,
+            table_def: Dict[str, str],
+            column_mappings: Dict[str, Dict[str, Any]]
+    ) -> Dict[str, Callable[[BaseModel], Any]]:
+        accessors = {}
+        for column_name in table_def:
+            column_mapping = column_mappings.get(column_name)
+            accessor = cls._compile_accessor(column_mapping.get("attr_name"))
+            if transform_config := column_mapping.get("transform", {}):
+                accessor = (
+                    lambda base_model, _accessor=accessor, _config=transform_config:
+                    cls._transform_value(_accessor(base_model), **_config)
+                )
+            accessors[column_name] = accessor
+        return accessors
+
+    @staticmethod
+    def _build_columns(
+            base_models: List[BaseModel],
+            table_def: Dict[str, str],
+            accessors: Dict[str, Callable[[BaseModel], Any]]
+    ) -> pd.DataFrame:
+        return pd.DataFrame(
+            {
+                column_name: pd.Series(
+                    [accessor(base_model) for base_model in base_models],
+                    dtype=None if base_models else object
+                ).astype(table_def[column_name])
+                for column_name, accessor in accessors.items()
+            },
+            columns=list(table_def.keys())
+        )
+
+    @classmethod
+    def iter_pydantic(
+            cls,
+            table_name: str,
+            table_def: Dict[str, str],
+            column_mappings: Dict[str, Dict[str, Any]],
+            base_models: Iterable[BaseModel],
+            chunksize: int = 50_000
+    ) -> Iterator["RyDBTable"]:
+        accessors = cls._compile_accessors(table_def, column_mappings)
+        base_models = iter(base_models)
+        while chunk := list(islice(base_models, chunksize)):
+            logging.debug(f"Building {len(chunk)} rows of {table_name}")
+            yield cls(table_name, cls._build_columns(chunk, table_def, accessors))
+
     @classmethod
     def from_pydantic(
             cls,
             table_name: str,
             table_def: Dict[str, str],
-            column_mappings: List[Dict[str, str]],
-            *base_models: BaseModel,
+            column_mappings: Dict[str, Dict[str, Any]],
+            *base_models: Union[BaseModel, Iterable[BaseModel]],
             ignore_by_any: Any = None,
-            ignore_by_path: Any = None
+            ignore_by_path: Any = None,
+            chunksize: int = 50_000
     ):
-        table_values = []
-        for base_model in base_models:
-            row_values = []
-            for column_name, dtype in table_def.items():
-                logging.debug(f"Calculating {column_name}:{dtype}")
-                column_mapping = column_mappings.get(column_name)
-
-                attr_name = column_mapping.get("attr_name")
-                attr_value = cls._extract_attribute_from_base_model(
-                    base_model,
-                    attr_name
-                )
-                if transform_config := column_mapping.get("transform", {}):
-                    attr_value = cls._transform_value(
-                        attr_value,
-                        **transform_config
-                    )
-                row_values.append(attr_value)
-            table_values.append(row_values)
-        table = pd.DataFrame(
-            table_values,
-            columns=list(table_def.keys())
-        ).astype(table_def)
+        if len(base_models) == 1 and not isinstance(base_models[0], BaseModel):
+            base_models = base_models[0]
+        chunks = [
+            chunk.df
+            for chunk in cls.iter_pydantic(
+                table_name,
+                table_def,
+                column_mappings,
+                base_models,
+                chunksize=chunksize
+            )
+        ]
+        if not chunks:
+            accessors = cls._compile_accessors(table_def, column_mappings)
+            return cls(table_name, cls._build_columns([], table_def, accessors))
+        table = chunks[0] if len(chunks) == 1 else pd.concat(chunks, ignore_index=True)
         return cls(table_name, table)
 
     def __repr__(self):
@@ -204,12 +621,97 @@ class RyDBTable:
     def columns(self):
         return self.df.columns.tolist()
 
+    def create_index(self, columns: Union[str, List[str]], unique: bool = False) -> RyDBIndex:
+        columns = [columns] if isinstance(columns, str) else list(columns)
+        index = RyDBIndex(columns, unique=unique)
+        index.build(self.df)
+        self.indexes[tuple(columns)] = index
+        return index
+
+    def drop_index(self, columns: Union[str, List[str]]):
+        columns = [columns] if isinstance(columns, str) else list(columns)
+        self.indexes.pop(tuple(columns), None)
+
+    def get_index(self, columns: List[str]) -> Optional[RyDBIndex]:
+        for index in self.indexes.values():
+            if set(index.columns) == set(columns):
+                return index
+
+    def _reindex(self, columns: List[str] = None):
+        for index in self.indexes.values():
+            if columns is None or set(index.columns) & set(columns):
+                index.build(self.df)
+
+    def _positions(self, where_dict: dict) -> Optional[np.ndarray]:
+        if (index := self.get_index(list(where_dict))) is None:
+            return None
+        return index.get(index.key_for(where_dict))
+
+    def _primary_key_values(self, positions: np.ndarray) -> Optional[List[tuple]]:
+        if not self.primary_key:
+            return None
+        return list(
+            self.df[self.primary_key].iloc[positions].itertuples(index=False, name=None)
+        )
+
+    def _mask_positions(self, where_dict: dict) -> np.ndarray:
+        mask = np.logical_and.reduce([
+            (self.df[column] == value).to_numpy(dtype=bool, na_value=False)
+            for column, value in where_dict.items()
+        ])
+        return np.flatnonzero(mask)
+
+    def enable_cache(self, max_entries: int = 128, max_rows: int = None) -> QueryCache:
+        self.cache = QueryCache(max_entries=max_entries, max_rows=max_rows)
+        return self.cache
+
+    def disable_cache(self):
+        self.cache = None
+
+    @property
+    def cache_stats(self) -> Optional[CacheStats]:
+        return self.cache.stats if self.cache is not None else None
+
+    def _touch(self):
+        self.version += 1
+        if self.cache is not None:
+            self.cache.clear()
+
     def loc(
             self,
-            query: Union[str, pd.Series],
+            query: Union[str, pd.Series, dict],
             column_names: List[str] = None,
             squeeze: bool = False
     ):
+        if self.cache is None:
+            return self._loc(query, column_names, squeeze)
+        key = QueryCache.key_for(
+            query,
+            tuple(column_names) if column_names is not None else None,
+            squeeze,
+            self.version
+        )
+        if key is None:
+            return self._loc(query, column_names, squeeze)
+        if (result := self.cache.get(key)) is None:
+            result = self._loc(query, column_names, squeeze)
+            self.cache.put(key, result)
+        return result.copy() if isinstance(result, (pd.DataFrame, pd.Series)) else result
+
+    def _loc(
+            self,
+            query: Union[str, pd.Series, dict],
+            column_names: List[str] = None,
+            squeeze: bool = False
+    ):
+        if isinstance(query, dict):
+            positions = self._positions(query)
+            if positions is None:
+                positions = self._mask_positions(query)
+            result = self.df.iloc[positions]
+            if column_names is not None:
+                result = result[column_names]
+            return result.squeeze() if squeeze else result
         mask = self.df.eval(query) if isinstance(query, str) else query
         target = (mask,) if column_names is None else (mask, column_names)
         result = self.df.loc[target]
@@ -243,20 +745,155 @@ class RyDBTable:
         set_columns = list(set_dict.keys())
         set_values = list(set_dict.values())
         where_query = self.format_where_query(where_dict)
-        self.df.loc[self.df.eval(where_query), set_columns] = set_values
+        positions = self._positions(where_dict)
+        if positions is None:
+            positions = np.flatnonzero(self.df.eval(where_query).to_numpy())
+        for set_column in set_columns:
+            if set_column not in self.df.columns:
+                self.df[set_column] = np.nan
+        self._own(set_columns)
+        original_keys = None
+        if self.primary_key and set(self.primary_key) & set(set_columns):
+            original_keys = self._primary_key_values(positions)
+        moved = []
+        for index in self.indexes.values():
+            if not set(index.columns) & set(set_columns):
+                continue
+            old_keys = [index.key_for(self.df.iloc[position]) for position in positions]
+            new_keys = [
+                index.key_for({**dict(zip(index.columns, old_key)), **set_dict})
+                for old_key in old_keys
+            ]
+            index.check_moves(positions, new_keys)
+            moved.append((index, old_keys, new_keys))
+        if len(positions):
+            self.df.iloc[
+                positions,
+                [self.df.columns.get_loc(set_column) for set_column in set_columns]
+            ] = set_values
+        for index, old_keys, new_keys in moved:
+            for position, old_key, new_key in zip(positions, old_keys, new_keys):
+                index.move(position, old_key, new_key)
+        self.changes.mark_updated(self.df.index[positions], set_columns, original_keys)
+        self._touch()
         logging.info(f"({','.join(self.stringify(set_columns))}) updated to ({','.join(self.stringify(set_values))}) for {where_query}")
 
+    def set_values(self, labels: List[Any], column_name: str, values: List[Any]):
+        if column_name not in self.df.columns:
+            self.df[column_name] = pd.Series(dtype=object)
+        self._own([column_name])
+        positions = self.df.index.get_indexer(labels)
+        original_keys = None
+        if self.primary_key and column_name in self.primary_key:
+            original_keys = self._primary_key_values(positions)
+        self.df.iloc[positions, self.df.columns.get_loc(column_name)] = values
+        self._reindex([column_name])
+        self.changes.mark_updated(self.df.index[positions], [column_name], original_keys)
+        self._touch()
+
+    def _key_positions(self, keys: pd.DataFrame) -> np.ndarray:
+        on = keys.columns.tolist()
+        if (index := self.get_index(on)) is not None and index.unique:
+            return np.array(
+                [
+                    found[0] if len(found := index.get(index.key_for(dict(zip(on, key))))) else -1
+                    for key in keys.itertuples(index=False, name=None)
+                ],
+                dtype=np.intp
+            )
+        table_keys = pd.MultiIndex.from_frame(self.df[on])
+        if not table_keys.is_unique:
+            raise ValueError(f"Keys {on} are not unique in {self.name}!")
+        return table_keys.get_indexer(pd.MultiIndex.from_frame(keys))
+
+    def update_rows(
+            self,
+            changes: pd.DataFrame,
+            on: Union[str, List[str]]
+    ) -> UpdateSummary:
+        on = [on] if isinstance(on, str) else list(on)
+        value_columns = [column for column in changes.columns if column not in on]
+        positions = self._key_positions(changes[on])
+        matched = np.flatnonzero(positions >= 0)
+        positions = positions[matched]
+        incoming = changes.iloc[matched].reset_index(drop=True)
+        for column in value_columns:
+            if column not in self.df.columns:
+                self.df[column] = np.nan
+        self._own(value_columns)
+        current = self.df.iloc[positions][value_columns].reset_index(drop=True)
+        differs = current.ne(incoming[value_columns]) & ~(
+            current.isna() & incoming[value_columns].isna()
+        )
+        rows_changed = differs.any(axis=1).to_numpy()
+        original_keys = None
+        if self.primary_key and set(self.primary_key) & set(value_columns):
+            original_keys = self._primary_key_values(positions[rows_changed])
+        for column in value_columns:
+            if not (column_differs := differs[column].to_numpy()).any():
+                continue
+            self.df.iloc[
+                positions[column_differs],
+                self.df.columns.get_loc(column)
+            ] = incoming[column].to_numpy()[column_differs]
+        diff = incoming[rows_changed].set_axis(self.df.index[positions[rows_changed]])
+        if rows_changed.any():
+            self._reindex(value_columns)
+        self.changes.mark_updated(diff.index, value_columns, original_keys)
+        self._touch()
+        summary = UpdateSummary(
+            matched=len(matched),
+            changed=int(rows_changed.sum()),
+            unmatched=len(changes) - len(matched),
+            diff=diff
+        )
+        logging.info(
+            f"{self.name}: {summary.matched} rows matched on ({','.join(on)}), "
+            f"{summary.changed} changed, {summary.unmatched} unmatched"
+        )
+        return summary
+
     def lookup(self, *args):
         return self.loc(*args)
 
-    def _refresh(self):
-        self.__dict__.update(
-            {
-                column_name: self.df[column_name]
-                for column_name in self.columns
-            }
+    def schema(self, sample_size: int = DEFAULT_SAMPLE_SIZE) -> TableSchema:
+        return TableSchema.from_frame(
+            self.name,
+            self.df,
+            primary_key=self.primary_key,
+            sample_size=sample_size
         )
 
+    def to_ddl(self, dialect: str = "mssql") -> str:
+        return self.schema().to_ddl(dialect)
+
+    def memory_usage(self) -> int:
+        return int(self.df.memory_usage(index=True, deep=True).sum())
+
+    def compact(
+            self,
+            category_threshold: float = 0.5,
+            string_storage: str = "python",
+            float_to_int: bool = False
+    ) -> MemoryReport:
+        before = self.memory_usage()
+        dtypes = {}
+        for column_name in self.columns:
+            dtype = DataType.compact_dtype(
+                self.df[column_name],
+                category_threshold=category_threshold,
+                string_storage=string_storage,
+                float_to_int=float_to_int
+            )
+            if dtype is not None and dtype != self.df[column_name].dtype:
+                dtypes[column_name] = dtype
+        if dtypes:
+            self.df = self.df.astype(dtypes)
+            self._touch()
+        report = MemoryReport(self.name, before, self.memory_usage())
+        logging.info(f"Compacted {report}")
+        return report
+
     @staticmethod
     def regextract(pattern: str, value: str):
         return json.dumps(
@@ -267,64 +904,170 @@ class RyDBTable:
             )
         )
 
+    @staticmethod
+    def extract_by_regex(pattern: Union[str, re.Pattern], source_column: pd.Series) -> pd.DataFrame:
+        regex = re.compile(pattern)
+        group_names = sorted(regex.groupindex, key=regex.groupindex.get)
+        values = pd.Series(source_column.to_numpy(), dtype=object).astype(str)
+        if not group_names:
+            return pd.DataFrame(index=source_column.index)
+        matches = values.str.extractall(regex)[group_names]
+        if matches.empty:
+            return pd.DataFrame(index=source_column.index)
+        positions = matches.index.get_level_values(0).to_numpy()
+        starts = np.flatnonzero(matches.index.get_level_values(1).to_numpy() == 0)
+        match_counts = np.diff(np.append(starts, len(positions)))
+        repeated = np.flatnonzero(match_counts > 1)
+        extracted = {}
+        for group_name in group_names:
+            group_values = matches[group_name].to_numpy(dtype=object)
+            column = np.full(len(values), np.nan, dtype=object)
+            column[positions[starts]] = group_values[starts]
+            if len(repeated):
+                group_values = np.where(pd.isna(group_values), None, group_values)
+                for start, count in zip(starts[repeated], match_counts[repeated]):
+                    column[positions[start]] = group_values[start:start + count].tolist()
+            extracted[group_name] = column
+        return pd.DataFrame(extracted, index=source_column.index)
+
+    @staticmethod
+    def _map_extracted(column: pd.Series, column_mapping: dict) -> pd.Series:
+        repeated = column.map(lambda value: isinstance(value, list), na_action="ignore").fillna(False).astype(bool)
+        if not repeated.any():
+            return column.map(column_mapping)
+        mapped = column.astype(object)
+        mapped[~repeated] = column[~repeated].map(column_mapping)
+        mapped[repeated] = column[repeated].map(
+            lambda values: [column_mapping.get(value) for value in values]
+        )
+        return mapped
+
     def add_columns_by_regex(
             self,
-            pattern: str,
+            pattern: Union[str, re.Pattern],
             source_column_name: str,
             column_order: List[str] = None,
             column_mappings: dict = None,
             boolean_columns: List[str] = None
     ) -> None:
-        source_column = getattr(self, source_column_name)
-        json_column_values = source_column.apply(
-            lambda x: self.regextract(pattern, x)
-        ).apply(json.loads).tolist()
-        json_columns = pd.DataFrame(json_column_values)
-        for json_column in json_columns:
-            if column_mapping := column_mappings.get(json_column):
-                json_columns[json_column] = json_columns[json_column].apply(
-                    lambda x: column_mapping.get(x)
-                )
-            if json_column in boolean_columns:
-                json_columns[json_column] = np.where(
-                    json_columns[json_column].notna(),
-                    True,
-                    False
-                )
+        column_mappings = column_mappings or {}
+        boolean_columns = boolean_columns or []
+        extracted = self.extract_by_regex(pattern, self.df[source_column_name])
+        for column_name in extracted:
+            if column_mapping := column_mappings.get(column_name):
+                extracted[column_name] = self._map_extracted(extracted[column_name], column_mapping)
+            if column_name in boolean_columns:
+                extracted[column_name] = extracted[column_name].notna().to_numpy()
         if column_order is not None:
-            json_columns = json_columns[column_order]
-        for json_column in json_columns:
-            self.df[json_column] = json_columns[json_column]
-        self._refresh()
+            extracted = extracted[column_order]
+        for column_name in extracted:
+            if column_name in self._shared:
+                self._replace(column_name, extracted[column_name])
+            else:
+                self.df[column_name] = extracted[column_name]
+        self._reindex(extracted.columns.tolist())
+        self._touch()
+
+    def _new_labels(self, count: int) -> pd.Index:
+        start = self._next_label
+        if len(self.df) and pd.api.types.is_integer_dtype(self.df.index):
+            start = max(start, int(self.df.index.max()) + 1)
+        self._next_label = start + count
+        return pd.RangeIndex(start, start + count)
+
+    def append_rows(self, rows: pd.DataFrame):
+        for index in self.indexes.values():
+            index.check_extend(rows)
+        offset = len(self.df)
+        labels = self._new_labels(len(rows))
+        self.df = pd.concat([self.df, rows.set_axis(labels)])
+        for index in self.indexes.values():
+            index.extend(self.df.iloc[offset:], offset=offset)
+        self.changes.mark_inserted(labels)
+        self._touch()
+
+    def upsert_rows(self, rows: pd.DataFrame, on: Union[str, List[str]]) -> UpdateSummary:
+        on = [on] if isinstance(on, str) else list(on)
+        matched = self._key_positions(rows[on]) >= 0
+        summary = self.update_rows(rows[matched], on=on)
+        self.append_rows(rows[~matched])
+        summary.unmatched = int((~matched).sum())
+        return summary
+
+    def delete_rows(self, where_dict: dict) -> int:
+        positions = self._positions(where_dict)
+        if positions is None:
+            positions = self._mask_positions(where_dict)
+        return self._delete_positions(positions)
+
+    def delete_keys(self, keys: pd.DataFrame) -> int:
+        positions = self._key_positions(keys)
+        return self._delete_positions(np.sort(positions[positions >= 0]))
+
+    def _delete_positions(self, positions: np.ndarray) -> int:
+        labels = self.df.index[positions]
+        keys = self._primary_key_values(positions) or [None] * len(positions)
+        keep = np.ones(len(self.df), dtype=bool)
+        keep[positions] = False
+        self.df = self.df.iloc[keep]
+        self.changes.mark_deleted(labels, keys)
+        self._reindex()
+        self._touch()
+        logging.info(f"{len(positions)} rows deleted from {self.name}")
+        return len(positions)
 
     def append_right(self, right_df: pd.DataFrame):
         self.df = self.df.join(right_df)
-        self._refresh()
+        self._reindex()
+        self._touch()
 
-    def to_rich_console_table(
+    def page(
             self,
-            query: str,
-            name: str = None,
-            column_formats: dict = None,
+            offset: int = 0,
             count: int = 10,
-            fillna: str = ""
-    ):
-        table = Table(title=name or self.name)
-        results = self.df.fillna("").query(query).head(count)
+            where_dict: dict = None,
+            query: str = None
+    ) -> pd.DataFrame:
+        if where_dict:
+            positions = self._positions(where_dict)
+            if positions is None:
+                positions = self._mask_positions(where_dict)
+        elif query is not None:
+            positions = np.flatnonzero(self.df.eval(query).to_numpy(dtype=bool))
+        else:
+            return self.df.iloc[offset:offset + count]
+        return self.df.iloc[positions[offset:offset + count]]
 
+    @staticmethod
+    def to_rich_table(
+            rows: pd.DataFrame,
+            title: str = None,
+            column_formats: dict = None,
+            fillna: str = ""
+    ) -> Table:
+        table = Table(title=title)
         column_formats = column_formats or {
-            column: {} for column in self.columns
+            column: {} for column in rows.columns
         }
-
         for column, column_format in column_formats.items():
-            # column_format = column_formats.get(column, {})
-            table.add_column(column, **column_format)
-
-        for row in results.astype("string").itertuples():
-            row_values = [
-                getattr(row, column, fillna)
-                for column in column_formats
-            ]
+            table.add_column(str(column), **column_format)
+        visible = rows.reindex(columns=list(column_formats)).astype("string").fillna(fillna)
+        for row_values in visible.itertuples(index=False, name=None):
             table.add_row(*row_values)
-
         return table
+
+    def to_rich_console_table(
+            self,
+            query: str = None,
+            name: str = None,
+            column_formats: dict = None,
+            count: int = 10,
+            fillna: str = "",
+            offset: int = 0
+    ):
+        return self.to_rich_table(
+            self.page(offset, count, query=query),
+            title=name or self.name,
+            column_formats=column_formats,
+            fillna=fillna
+        )
@@ -0,0 +1,70 @@
+import pandas as pd
+import pytest
+
+from rypython.rydb.databases import RyDB
+
+
+@pytest.fixture
+def db(tmp_path):
+    path = tmp_path / "test.db"
+    with RyDB.read_sqlite(path, load=False) as setup:
+        setup.source.create_table(
+            "items",
+            pd.DataFrame({"id": [1], "name": ["a"], "qty": [1]}),
+            primary_key=["id"]
+        )
+        setup.source.insert_df("items", pd.DataFrame({"id": [1, 2, 3], "name": ["a", "b", "c"], "qty": [1, 2, 3]}))
+        setup.source.execute('CREATE TABLE "log" ("message" TEXT, "level" INTEGER)')
+    return RyDB.read_sqlite(path)
+
+
+def _rows(db, table_name):
+    return db.source.read_query(f'SELECT * FROM "{table_name}" ORDER BY 1')
+
+
+def test_commit_inserts_updates_and_deletes(db):
+    items = db.conn["items"]
+    items.update_row({"qty": 20}, {"id": 2})
+    items.delete_rows({"id": 1})
+    items.append_rows(pd.DataFrame({"id": [4], "name": ["d"], "qty": [4]}))
+    db.commit()
+    rows = _rows(db, "items")
+    assert rows.id.tolist() == [2, 3, 4]
+    assert rows.qty.tolist() == [20, 3, 4]
+    assert not items.changes.is_dirty
+
+
+def test_commit_primary_key_change(db):
+    db.conn["items"].update_row({"id": 30}, {"id": 3})
+    db.commit()
+    assert _rows(db, "items").id.tolist() == [1, 2, 30]
+
+
+def test_commit_appends_to_keyless_table(db):
+    db.conn["log"].append_rows(pd.DataFrame({"message": ["started"], "level": [1]}))
+    db.commit()
+    assert _rows(db, "log").message.tolist() == ["started"]
+
+
+def test_keyless_updates_are_refused(db):
+    db.conn["log"].append_rows(pd.DataFrame({"message": ["started"], "level": [1]}))
+    db.commit()
+    db.conn["log"] = db.source.collect_table("log")
+    db.conn["log"].update_row({"level": 2}, {"level": 1})
+    with pytest.raises(ValueError):
+        db.commit()
+
+
+def test_generated_columns_are_left_out_of_inserts(db):
+    db.source.execute('ALTER TABLE "items" ADD COLUMN "version" INTEGER DEFAULT 7')
+    db.conn["items"] = db.source.collect_table("items")
+    db.source.generated_columns["items"] = ["version"]
+    db.conn["items"].append_rows(pd.DataFrame({"id": [4], "name": ["d"], "qty": [4]}))
+    db.commit()
+    assert _rows(db, "items").version.tolist() == [7, 7, 7, 7]
+
+
+def test_create_table_quotes_the_table_name(db):
+    db.source.create_table("order items", pd.DataFrame({"id": [1], "note": ["x"]}), primary_key=["id"])
+    db.source.insert_df("order items", pd.DataFrame({"id": [1], "note": ["x"]}))
+    assert _rows(db, "order items").note.tolist() == ["x"]
@@ -0,0 +1,26 @@
+import datetime
+
+import pandas as pd
+
+from rypython.rydb.fetch import ColumnBuffer
+
+
+def _column(values):
+    buffer = ColumnBuffer("value", datetime.datetime, capacity=len(values))
+    buffer.extend(tuple(values))
+    return pd.Series(buffer.to_array())
+
+
+def test_datetimes_in_range_are_nanosecond():
+    column = _column([datetime.datetime(2023, 1, 2, 3, 4, 5, 6), None])
+    assert column.dtype == "datetime64[ns]"
+    assert column[0] == pd.Timestamp(2023, 1, 2, 3, 4, 5, 6)
+    assert pd.isna(column[1])
+
+
+def test_open_ended_sentinel_is_not_wrapped():
+    sentinel = datetime.datetime(9999, 12, 31)
+    column = _column([datetime.datetime(2023, 1, 1), sentinel, None])
+    assert column[0] == datetime.datetime(2023, 1, 1)
+    assert column[1] == sentinel
+    assert pd.isna(column[2])
@@ -0,0 +1,73 @@
+import sqlite3
+
+import pandas as pd
+import pytest
+
+from rypython.rydb.join import JoinPlan
+from rypython.rydb.tables import RyDBTable
+
+
+def _tables(indexed: bool):
+    orders = RyDBTable(
+        "orders",
+        pd.DataFrame({"id": [1, 2, 3, 4], "customer": [1, 1, 2, 9], "total": [5.0, 6.0, 7.0, 8.0]}),
+        primary_key=["id"]
+    )
+    customers = RyDBTable(
+        "customers",
+        pd.DataFrame({"customer": [1, 2, 3], "name": ["a", "b", "c"], "total": [11.0, 7.0, 0.0]}),
+        primary_key=["customer"]
+    )
+    if indexed:
+        orders.create_index("customer")
+        customers.create_index("customer", unique=True)
+    return orders, customers
+
+
+def _plan(orders, customers, how, columns=None):
+    return JoinPlan.build(
+        "orders",
+        orders.df.columns.tolist(),
+        "customers",
+        customers.df.columns.tolist(),
+        "customer",
+        columns=columns,
+        how=how
+    )
+
+
+def _sorted(df):
+    df = df.sort_values(df.columns.tolist()).reset_index(drop=True).astype(object)
+    return df.where(df.notna(), None)
+
+
+@pytest.mark.parametrize("indexed", [True, False])
+@pytest.mark.parametrize("how", ["inner", "left", "right", "outer"])
+def test_hash_join_matches_sql(how, indexed):
+    orders, customers = _tables(indexed)
+    plan = _plan(orders, customers, how)
+    conn = sqlite3.connect(":memory:")
+    orders.df.to_sql("orders", conn, index=False)
+    customers.df.to_sql("customers", conn, index=False)
+    expected = pd.read_sql(plan.to_sql(lambda name: f'"{name}"'), conn)
+    result = plan.hash_join(orders, customers)
+    assert result.columns.tolist() == ["customer", "id", "total", "name", "customers.total"]
+    pd.testing.assert_frame_equal(_sorted(result), _sorted(expected), check_dtype=False)
+
+
+def test_projection_by_qualified_name():
+    orders, customers = _tables(indexed=True)
+    plan = _plan(orders, customers, "inner", columns=["id", "name", "customers.total"])
+    result = plan.hash_join(orders, customers)
+    assert result.columns.tolist() == ["id", "name", "customers.total"]
+    assert result.sort_values("id")["customers.total"].tolist() == [11.0, 11.0, 7.0]
+
+
+def test_ambiguous_and_missing_columns_are_refused():
+    orders, customers = _tables(indexed=False)
+    with pytest.raises(ValueError):
+        _plan(orders, customers, "inner", columns=["total"])
+    with pytest.raises(KeyError):
+        _plan(orders, customers, "inner", columns=["nope"])
+    with pytest.raises(ValueError):
+        _plan(orders, customers, "cross")
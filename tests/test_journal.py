@@ -0,0 +1,79 @@
+import contextlib
+import datetime
+import decimal
+
+import pandas as pd
+import pytest
+
+from rypython.rydb.journal import Journal, WriteBehind
+
+
+def test_round_trip_of_sql_values(tmp_path):
+    journal = Journal(tmp_path / "journal.jsonl", fsync=False)
+    set_dict = {
+        "day": datetime.date(2023, 1, 2),
+        "at": datetime.datetime(2023, 1, 2, 3, 4, 5),
+        "time": datetime.time(3, 4, 5),
+        "amount": decimal.Decimal("12.30"),
+        "stamp": pd.Timestamp("2023-01-02 03:04:05"),
+        "missing": pd.NaT,
+        "unknown": pd.NA
+    }
+    rows = pd.DataFrame({"id": [1, 2], "when": [pd.Timestamp("2023-01-02"), pd.NaT]})
+    journal.append("update_row", "t", set_dict=set_dict, where_dict={"id": 1})
+    journal.append("append_rows", "t", rows=rows)
+    journal.close()
+
+    update, append = Journal(tmp_path / "journal.jsonl").entries()
+    assert update["payload"]["set_dict"] == {**set_dict, "missing": None, "unknown": None}
+    assert append["payload"]["rows"].id.tolist() == [1, 2]
+    assert append["payload"]["rows"].when[0] == pd.Timestamp("2023-01-02")
+    assert pd.isna(append["payload"]["rows"].when[1])
+
+
+class _Source:
+    type = "test"
+
+    def __init__(self):
+        self.staged = []
+        self.commits = 0
+
+    def stage(self, op, table_name, **payload):
+        if table_name not in ("t", "u"):
+            raise KeyError(table_name)
+        self.staged.append((op, table_name, payload))
+
+    def commit(self):
+        self.commits += 1
+
+    @contextlib.contextmanager
+    def measure(self, *args, **kwargs):
+        yield
+
+
+def test_failed_stage_is_not_journaled(tmp_path):
+    source = _Source()
+    write_behind = WriteBehind(source, tmp_path / "journal.jsonl", fsync=False)
+    with pytest.raises(KeyError):
+        write_behind.apply("delete_rows", "missing", where_dict={"id": 1})
+    assert write_behind.pending == 0
+    write_behind.apply("delete_rows", "t", where_dict={"id": 1})
+    assert write_behind.pending == 1
+    assert [entry["table"] for entry in write_behind.journal.pending_entries()] == ["t"]
+
+
+def test_replay_skips_committed_entries(tmp_path):
+    path = tmp_path / "journal.jsonl"
+    journal = Journal(path, fsync=False)
+    journal.append("delete_rows", "t", where_dict={"id": 1})
+    journal.mark_committed(journal.sequence)
+    journal.append("delete_rows", "u", where_dict={"id": 2})
+    journal.close()
+
+    source = _Source()
+    write_behind = WriteBehind(source, path, fsync=False)
+    assert source.staged == [("delete_rows", "u", {"where_dict": {"id": 2}})]
+    assert source.commits == 1
+    assert write_behind.pending == 0
+    write_behind.close()
+    assert not list(Journal(path).pending_entries())
@@ -0,0 +1,17 @@
+import pandas as pd
+import pytest
+
+from rypython.rydb.snapshot import read_snapshot, write_snapshot
+from rypython.rydb.tables import RyDBTable
+
+pytest.importorskip("pyarrow")
+
+
+def test_snapshot_round_trip_keeps_numpy_dtypes(tmp_path):
+    df = pd.DataFrame({"id": [1, 2], "price": [1.5, None], "name": ["a", None]})
+    write_snapshot(tmp_path, {"items": RyDBTable("items", df, primary_key=["id"])})
+    version, tables = read_snapshot(tmp_path)
+    items = tables["items"]
+    assert items.primary_key == ["id"]
+    assert items.df.dtypes.astype(str).tolist() == ["int64", "float64", "object"]
+    assert items.df.name.tolist() == ["a", None]
@@ -0,0 +1,143 @@
+import pandas as pd
+import pytest
+
+from rypython.rydb.tables import RyDBTable
+
+
+def _table():
+    return RyDBTable(
+        "t",
+        pd.DataFrame({"id": [1, 2, 3], "v": [10.0, 20.0, 30.0], "code": ["a1", "b2", "c3"]}),
+        primary_key=["id"]
+    )
+
+
+def test_rollback_after_update_row():
+    table = _table()
+    snapshot = table.snapshot()
+    table.update_row({"v": 1.0}, {"id": 1})
+    assert snapshot.df.v.tolist() == [10.0, 20.0, 30.0]
+    table.rollback(snapshot)
+    assert table.df.v.tolist() == [10.0, 20.0, 30.0]
+    assert not table.changes.is_dirty
+
+
+def test_rollback_after_update_rows():
+    table = _table()
+    snapshot = table.snapshot()
+    table.update_rows(pd.DataFrame({"id": [2], "v": [5.0]}), on="id")
+    table.rollback(snapshot)
+    assert table.df.v.tolist() == [10.0, 20.0, 30.0]
+
+
+def test_rollback_after_set_values_and_append():
+    table = _table()
+    table.create_index("id", unique=True)
+    snapshot = table.snapshot()
+    table.set_values([0], "v", [9.0])
+    table.append_rows(pd.DataFrame({"id": [4], "v": [40.0], "code": ["d4"]}))
+    table.rollback(snapshot)
+    assert table.df.v.tolist() == [10.0, 20.0, 30.0]
+    assert table.loc({"id": 4}).empty
+
+
+def test_rollback_after_add_columns_by_regex():
+    table = _table()
+    snapshot = table.snapshot()
+    table.add_columns_by_regex(r"(?P<code>[a-z])\d", "code")
+    assert table.df.code.tolist() == ["a", "b", "c"]
+    table.rollback(snapshot)
+    assert table.df.code.tolist() == ["a1", "b2", "c3"]
+
+
+def test_release_keeps_changes():
+    table = _table()
+    snapshot = table.snapshot()
+    table.update_row({"v": 1.0}, {"id": 1})
+    table.release(snapshot)
+    table.update_row({"v": 2.0}, {"id": 2})
+    assert table.df.v.tolist() == [1.0, 2.0, 30.0]
+
+
+def _compacted():
+    table = RyDBTable(
+        "c",
+        pd.DataFrame({
+            "id": [1, 2, 3, 4],
+            "n": pd.array([1, None, 3, 1], dtype="Int64"),
+            "flag": [True, None, False, True],
+            "name": ["x", None, "y", "z"]
+        }),
+        primary_key=["id"]
+    )
+    table.compact(category_threshold=0)
+    return table
+
+
+def test_loc_on_nullable_columns():
+    table = _compacted()
+    assert table.loc({"n": 1}).id.tolist() == [1, 4]
+    assert table.loc({"flag": True}).id.tolist() == [1, 4]
+    assert table.loc({"name": "y"}).id.tolist() == [3]
+
+
+def test_delete_rows_on_nullable_columns():
+    table = _compacted()
+    assert table.delete_rows({"n": 1}) == 2
+    assert table.df.id.tolist() == [2, 3]
+
+
+def test_index_follows_update_delete_and_append():
+    table = _table()
+    table.create_index("id", unique=True)
+    table.create_index("code")
+    table.update_row({"code": "z9"}, {"id": 2})
+    assert table.loc({"code": "z9"}).id.tolist() == [2]
+    assert table.loc({"code": "b2"}).empty
+    table.delete_rows({"id": 1})
+    assert table.loc({"id": 3}).v.tolist() == [30.0]
+    table.append_rows(pd.DataFrame({"id": [4], "v": [40.0], "code": ["z9"]}))
+    assert table.loc({"code": "z9"}).id.tolist() == [2, 4]
+    table.update_rows(pd.DataFrame({"id": [4], "code": ["d4"]}), on="id")
+    assert table.loc({"code": "z9"}).id.tolist() == [2]
+
+
+def test_unique_index_rejects_duplicates_without_changing_the_table():
+    table = _table()
+    table.create_index("id", unique=True)
+    with pytest.raises(ValueError):
+        table.append_rows(pd.DataFrame({"id": [3], "v": [0.0], "code": ["x"]}))
+    assert table.df.id.tolist() == [1, 2, 3]
+    assert not table.changes.inserted
+    table.append_rows(pd.DataFrame({"v": [1.0, 2.0]}))
+    assert len(table.df) == 5
+
+
+def test_cache_hits_until_the_table_changes():
+    table = _table()
+    table.enable_cache()
+    assert table.loc({"id": 2}, ["v"]).v.tolist() == [20.0]
+    assert table.loc({"id": 2}, ["v"]).v.tolist() == [20.0]
+    assert (table.cache_stats.hits, table.cache_stats.misses) == (1, 1)
+    table.update_row({"v": 2.0}, {"id": 2})
+    assert table.loc({"id": 2}, ["v"]).v.tolist() == [2.0]
+    assert table.cache_stats.misses == 2
+
+
+def test_cache_hands_out_copies():
+    table = _table()
+    table.enable_cache()
+    table.loc({"id": 1}).loc[:, "v"] = -1.0
+    assert table.loc({"id": 1}).v.tolist() == [10.0]
+
+
+def test_cache_evicts_least_recently_used():
+    table = _table()
+    table.enable_cache(max_entries=2)
+    table.loc({"id": 1})
+    table.loc({"id": 2})
+    table.loc({"id": 1})
+    table.loc({"id": 3})
+    assert table.cache_stats.evictions == 1
+    table.loc({"id": 1})
+    assert table.cache_stats.hits == 2